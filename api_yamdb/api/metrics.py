@@ -0,0 +1,163 @@
+"""Метрики запросов в формате Prometheus.
+
+RequestMetricsMiddleware замеряет для каждого запроса общее время, время
+и число SQL-запросов, время сериализации и размер ответа и добавляет их в
+гистограммы с метками `route` (имя маршрута) и `method`. Гистограммы
+хранятся в памяти процесса; при нескольких процессах каждый отдаёт свои.
+"""
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+LABELS = ('route', 'method')
+
+
+def escape(value):
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [
+                    [0] * (len(self.buckets) + 1), 0, 0
+                ]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.description}',
+            f'# TYPE {self.name} histogram',
+        ]
+        with self.lock:
+            series = sorted(
+                (labels, ([*counts], total, count))
+                for labels, (counts, total, count) in self.series.items()
+            )
+        bounds = [format_value(bound) for bound in self.buckets] + ['+Inf']
+        for labels, (counts, total, count) in series:
+            label_text = ','.join(
+                f'{name}="{escape(value)}"'
+                for name, value in zip(LABELS, labels)
+            )
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{self.name}_bucket{{{label_text},le="{bound}"}} '
+                    f'{cumulative}'
+                )
+            lines.append(
+                f'{self.name}_sum{{{label_text}}} {format_value(total)}'
+            )
+            lines.append(f'{self.name}_count{{{label_text}}} {count}')
+        return lines
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+
+REQUEST_DURATION = Histogram(
+    'yamdb_request_duration_seconds',
+    'Время обработки запроса.',
+    DURATION_BUCKETS,
+)
+DB_DURATION = Histogram(
+    'yamdb_request_db_duration_seconds',
+    'Время выполнения SQL-запросов за запрос.',
+    DURATION_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    'yamdb_request_db_queries',
+    'Число SQL-запросов за запрос.',
+    QUERY_BUCKETS,
+)
+SERIALIZER_DURATION = Histogram(
+    'yamdb_request_serializer_duration_seconds',
+    'Время сериализации и валидации данных за запрос.',
+    DURATION_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    'yamdb_response_size_bytes',
+    'Размер тела ответа.',
+    SIZE_BUCKETS,
+)
+HISTOGRAMS = (
+    REQUEST_DURATION,
+    DB_DURATION,
+    DB_QUERIES,
+    SERIALIZER_DURATION,
+    RESPONSE_SIZE,
+)
+
+
+class RequestMetrics:
+    """Счётчики одного запроса."""
+
+    __slots__ = ('db_time', 'queries', 'serializer_time')
+
+    def __init__(self):
+        self.db_time = 0.0
+        self.queries = 0
+        self.serializer_time = 0.0
+
+    def record(self, labels, duration, response_size):
+        REQUEST_DURATION.observe(labels, duration)
+        DB_DURATION.observe(labels, self.db_time)
+        DB_QUERIES.observe(labels, self.queries)
+        SERIALIZER_DURATION.observe(labels, self.serializer_time)
+        if response_size is not None:
+            RESPONSE_SIZE.observe(labels, response_size)
+
+
+def timed_serializer_method(method, metrics):
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            metrics.serializer_time += time.perf_counter() - started
+
+    return wrapper
+
+
+def render():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines += histogram.render()
+    return '\n'.join(lines) + '\n'
+
+
+def clear():
+    for histogram in HISTOGRAMS:
+        histogram.clear()
@@ -0,0 +1,45 @@
+import time
+from contextlib import ExitStack
+from functools import partial
+
+from django.db import connections
+
+from api.metrics import RequestMetrics
+
+
+def count_query(metrics, execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - started
+        metrics.queries += 1
+
+
+def get_route(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route
+
+
+class RequestMetricsMiddleware:
+    """Собирает метрики запроса (api.metrics). SQL-запросы учитываются
+    только выполненные в потоке запроса."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = request.metrics = RequestMetrics()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(
+                    partial(count_query, metrics)
+                ))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        size = None if response.streaming else len(response.content)
+        metrics.record((get_route(request), request.method), duration, size)
+        return response
@@ -1,10 +1,214 @@
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+from django.shortcuts import get_object_or_404
 from rest_framework import mixins, viewsets
+from rest_framework.fields import BooleanField
+from rest_framework.response import Response
+
+from api.metrics import timed_serializer_method
+from api.plans import get_plan
+from api.sparse import get_selected_fields, narrow_queryset, trim_serializer
+
+
+class AtomicWriteMixin:
+    """Создание, изменение и удаление объекта выполняются в одной
+    транзакции вместе с обработчиками сигналов (рейтинг, статистика,
+    версии таблиц, поисковый индекс): ошибка в любом из них откатывает и
+    саму запись."""
+
+    def create(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().create(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().update(request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().destroy(request, *args, **kwargs)
+
+
+class SerializerTimingMixin:
+    """Учитывает в метриках запроса (api.metrics) время сериализации и
+    валидации."""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        metrics = getattr(self.request, 'metrics', None)
+        if metrics is not None:
+            for name in ('to_representation', 'run_validation'):
+                setattr(serializer, name, timed_serializer_method(
+                    getattr(serializer, name), metrics
+                ))
+        return serializer
+
+
+class SparseFieldsMixin:
+    """Списки и объекты выводятся только с полями из `?fields=` и без
+    полей из `?omit=` (api.sparse); запрос сужается до нужных колонок и
+    связей."""
+
+    sparse_actions = ('list', 'retrieve')
+
+    def get_selected_fields(self):
+        if self.action not in self.sparse_actions:
+            return None
+        if not hasattr(self, '_selected_fields'):
+            self._selected_fields = get_selected_fields(
+                self.request.query_params, self.get_serializer_class()
+            )
+        return self._selected_fields
+
+    def get_required_columns(self):
+        """Колонки, нужные самому представлению, а не ответу: ключ и
+        поля пагинации по ключу."""
+        return (
+            self.queryset.model._meta.pk.name,
+            *getattr(self, 'cursor_ordering', ()),
+        )
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_selected_fields()
+        if fields is None:
+            return queryset
+        serializer_class = self.get_serializer_class()
+        return narrow_queryset(
+            queryset,
+            serializer_class,
+            fields,
+            plan=get_plan(serializer_class, fields),
+            keep=self.get_required_columns(),
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_selected_fields()
+        if fields is not None:
+            trim_serializer(serializer, fields)
+        return serializer
+
+
+class FastListMixin(SparseFieldsMixin):
+    """Список сериализуется по плану (api.plans) из строк values(), без
+    экземпляров моделей и сериализатора DRF. Если план для сериализатора
+    не строится или FAST_LIST_SERIALIZERS выключен, список выводится
+    обычным путём."""
+
+    def list(self, request, *args, **kwargs):
+        plan = None
+        if getattr(settings, 'FAST_LIST_SERIALIZERS', True):
+            plan = get_plan(
+                self.get_serializer_class(), self.get_selected_fields()
+            )
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        queryset = plan.values(
+            self.filter_queryset(self.get_queryset()),
+            *self.get_required_columns(),
+        )
+        serialize = plan.serialize
+        metrics = getattr(request, 'metrics', None)
+        if metrics is not None:
+            serialize = timed_serializer_method(serialize, metrics)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serialize(page))
+        return Response(serialize(queryset))
 
 
 class ListCreateDestroyViewSet(
+    AtomicWriteMixin,
+    SerializerTimingMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     viewsets.GenericViewSet,
 ):
     pass
+
+
+class ParentObjectMixin:
+    """Вложенный ресурс: объекты фильтруются по идентификаторам родителя из
+    URL без отдельного запроса к родителю.
+
+    `parent_lookups` сопоставляет поля фильтра дочерних объектов с
+    аргументами URL, `parent_filters` - поля фильтра самого родителя. Сам
+    родитель загружается не больше одного раза за запрос и только там, где
+    он действительно нужен: при создании объекта и для ответа 404 на
+    пустой список."""
+
+    parent_model = None
+    parent_lookups = {}
+    parent_filters = {}
+
+    def get_queryset(self):
+        return super().get_queryset().filter(**{
+            field: self.kwargs.get(kwarg)
+            for field, kwarg in self.parent_lookups.items()
+        })
+
+    def get_parent_filter(self):
+        return {
+            field: self.kwargs.get(kwarg)
+            for field, kwarg in self.parent_filters.items()
+        }
+
+    def get_parent(self):
+        if getattr(self, '_parent', None) is None:
+            self._parent = get_object_or_404(
+                self.parent_model, **self.get_parent_filter()
+            )
+        return self._parent
+
+    def check_parent_exists(self):
+        if getattr(self, '_parent', None) is not None:
+            return
+        exists = self.parent_model.objects.filter(
+            **self.get_parent_filter()
+        ).exists()
+        if not exists:
+            raise Http404
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None and not page:
+            self.check_parent_exists()
+        return page
+
+
+class StatisticsMixin:
+    """По `?stats=true` список отдаётся со статистикой группы
+    (reviews.models.Statistics). Она хранится готовой и загружается через
+    JOIN вместе с группами, без агрегации по произведениям и отзывам.
+
+    Статистика меняется вместе с `stats_cache_models`, поэтому они
+    добавляются к `cache_models` для кэша и ETag такого ответа."""
+
+    stats_serializer_class = None
+    stats_cache_models = ()
+
+    def stats_requested(self):
+        return (
+            self.action == 'list'
+            and self.request.query_params.get('stats')
+            in BooleanField.TRUE_VALUES
+        )
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.stats_requested():
+            queryset = queryset.select_related('statistics')
+        return queryset
+
+    def get_serializer_class(self):
+        if self.stats_requested():
+            return self.stats_serializer_class
+        return super().get_serializer_class()
+
+    def list(self, request, *args, **kwargs):
+        if self.stats_requested():
+            self.cache_models = (*self.cache_models, *self.stats_cache_models)
+        return super().list(request, *args, **kwargs)
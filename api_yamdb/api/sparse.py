@@ -0,0 +1,104 @@
+"""Частичный вывод полей по `?fields=` и `?omit=`.
+
+Оба параметра перечисляют поля ответа через запятую: `fields` оставляет
+только их, `omit` убирает. Вместе с ответом сужается и запрос: связи
+невыбранных полей не присоединяются (select_related) и не загружаются
+заранее (prefetch_related), а если для выбранных полей строится план
+(api.plans), из таблиц читаются только их колонки.
+"""
+from django.db.models import Prefetch
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+_sources = {}
+
+
+def get_sources(serializer_class):
+    """Поля вывода сериализатора и первые части их source."""
+    try:
+        return _sources[serializer_class]
+    except KeyError:
+        pass
+    sources = {
+        name: field.source.split('.')[0]
+        for name, field in serializer_class().fields.items()
+        if not field.write_only
+    }
+    _sources[serializer_class] = sources
+    return sources
+
+
+def parse_names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def get_selected_fields(query_params, serializer_class):
+    """Кортеж выбранных полей в порядке сериализатора или None, если
+    выводятся все поля."""
+    fields = parse_names(query_params.get(FIELDS_PARAM, ''))
+    omit = parse_names(query_params.get(OMIT_PARAM, ''))
+    if not fields and not omit:
+        return None
+    sources = get_sources(serializer_class)
+    errors = {}
+    for param, names in ((FIELDS_PARAM, fields), (OMIT_PARAM, omit)):
+        unknown = [name for name in names if name not in sources]
+        if unknown:
+            errors[param] = [f'Неизвестные поля: {", ".join(unknown)}.']
+    if errors:
+        raise ValidationError(errors)
+    selected = tuple(
+        name for name in sources
+        if (not fields or name in fields) and name not in omit
+    )
+    return None if len(selected) == len(sources) else selected
+
+
+def trim_serializer(serializer, fields):
+    """Убирает из сериализатора (или из child списка) невыбранные поля."""
+    target = getattr(serializer, 'child', serializer)
+    for name in list(target.fields):
+        if name not in fields:
+            del target.fields[name]
+    return serializer
+
+
+def flatten(select_related, prefix=''):
+    for name, nested in select_related.items():
+        yield prefix + name
+        yield from flatten(nested, f'{prefix}{name}__')
+
+
+def get_lookup(lookup):
+    if isinstance(lookup, Prefetch):
+        return lookup.prefetch_through
+    return lookup
+
+
+def narrow_queryset(queryset, serializer_class, fields, plan=None, keep=()):
+    """Queryset без связей невыбранных полей; с планом для `fields` -
+    только с колонками плана и `keep`."""
+    sources = get_sources(serializer_class)
+    needed = {sources[name] for name in fields}
+    if '*' in needed:
+        # Поле читает весь объект: какие связи ему нужны, неизвестно.
+        return queryset
+    select_related = queryset.query.select_related
+    if isinstance(select_related, dict):
+        lookups = [
+            lookup for lookup in flatten(select_related)
+            if lookup.split('__')[0] in needed
+        ]
+        queryset = queryset.select_related(None)
+        if lookups:
+            queryset = queryset.select_related(*lookups)
+    prefetch = [
+        lookup for lookup in queryset._prefetch_related_lookups
+        if get_lookup(lookup).split('__')[0] in needed
+    ]
+    queryset = queryset.prefetch_related(None).prefetch_related(*prefetch)
+    if plan is not None:
+        queryset = queryset.only(*dict.fromkeys((*plan.columns, *keep)))
+    return queryset
@@ -0,0 +1,51 @@
+"""Асинхронные представления списков произведений, отзывов и комментариев
+для запуска под ASGI.
+
+В Django 3.2 нет асинхронного ORM, а синхронное представление под ASGI
+выполняется через `sync_to_async(thread_sensitive=True)`, то есть все
+запросы по очереди проходят через один поток. Здесь чтение выполняется в
+пуле потоков целиком - запросы к базе, сериализация и отрисовка JSON, - а
+изменяющие запросы по-прежнему идут через общий поток.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+from api.v1.views import CommentViewSet, ReviewViewSet, TitlesViewSet
+
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+LIST_ACTIONS = {'get': 'list', 'post': 'create'}
+
+
+def run_view(view, request, *args, **kwargs):
+    # У рабочего потока своё соединение с базой: закрываем его по тем же
+    # правилам (CONN_MAX_AGE), что и соединение обычного запроса.
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_read_view(view):
+    """Оборачивает синхронное представление в асинхронное, выполняющее
+    чтение без очереди к общему потоку."""
+
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        run = sync_to_async(
+            run_view, thread_sensitive=request.method not in READ_METHODS
+        )
+        return await run(view, request, *args, **kwargs)
+
+    return async_view
+
+
+titles = async_read_view(TitlesViewSet.as_view(LIST_ACTIONS))
+reviews = async_read_view(ReviewViewSet.as_view(LIST_ACTIONS))
+comments = async_read_view(CommentViewSet.as_view(LIST_ACTIONS))
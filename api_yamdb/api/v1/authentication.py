@@ -0,0 +1,125 @@
+"""JWT-аутентификация без запроса к таблице пользователей.
+
+Токен, выданный TokenView, содержит роль и флаги пользователя, и по нему
+строится ClaimsUser - пользователь без строки из базы. Когда роль или
+флаги пользователя меняются, в кэш кладётся отметка времени изменения:
+токены, выпущенные до неё, до конца своего срока проверяются по базе.
+Токены без этих утверждений (например, выпущенные раньше) тоже
+проверяются по базе.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import User
+
+
+ACCESS_CLAIMS = ('role', 'is_active', 'is_superuser')
+
+
+def get_revocations_cache():
+    return caches[getattr(settings, 'AUTH_REVOCATIONS_CACHE', 'default')]
+
+
+def revocation_key(user_id):
+    return f'auth-changed:{user_id}'
+
+
+class ClaimsAccessToken(AccessToken):
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['username'] = user.username
+        for claim in ACCESS_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь, собранный из утверждений токена."""
+
+    @cached_property
+    def role(self):
+        return self.token['role']
+
+    @cached_property
+    def is_active(self):
+        return self.token['is_active']
+
+    @property
+    def is_admin(self):
+        return self.role == User.ADMIN
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+
+def get_user_instance(user):
+    """Строка пользователя из базы там, где она действительно нужна, -
+    например, для изменения профиля."""
+    if isinstance(user, ClaimsUser):
+        return User.objects.get(pk=user.pk)
+    return user
+
+
+def get_author(user):
+    """Пользователь для поля author новой записи. Для ClaimsUser это
+    экземпляр User только с id и username из токена: их хватает, чтобы
+    сохранить запись и вывести автора, а остальные поля догрузятся при
+    обращении."""
+    if isinstance(user, ClaimsUser):
+        return User.from_db(
+            DEFAULT_DB_ALIAS, ['id', 'username'], [user.pk, user.username]
+        )
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if not self.has_fresh_claims(validated_token):
+            return super().get_user(validated_token)
+        user = ClaimsUser(validated_token)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                'Пользователь неактивен.', code='user_inactive'
+            )
+        return user
+
+    def has_fresh_claims(self, token):
+        if any(claim not in token for claim in ACCESS_CLAIMS):
+            return False
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        changed = get_revocations_cache().get(revocation_key(user_id))
+        return changed is None or token.get('iat', 0) > changed
+
+
+def revoke_claims(user_id):
+    # Отметка нужна, пока живут выпущенные до неё токены.
+    lifetime = api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    get_revocations_cache().set(
+        revocation_key(user_id), int(time.time()), int(lifetime) + 1
+    )
+
+
+@receiver(post_save, sender=User)
+def revoke_on_access_change(sender, instance, created, **kwargs):
+    access = instance.get_access()
+    if not created and getattr(instance, '_loaded_access', None) != access:
+        revoke_claims(instance.pk)
+    instance._loaded_access = access
+
+
+@receiver(post_delete, sender=User)
+def revoke_on_delete(sender, instance, **kwargs):
+    revoke_claims(instance.pk)
@@ -0,0 +1,187 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import parse_http_date
+from django.utils.module_loading import import_string
+from rest_framework.response import Response
+
+from api.v1.conditional import get_table_versions, get_variant
+
+
+DEFAULT_RESPONSE_CACHE = {
+    'BACKEND': 'api.v1.cache.LRUResponseCache',
+    'TIMEOUT': 60,
+    'OPTIONS': {},
+}
+
+
+class LRUResponseCache:
+    """Кэш ответов в памяти процесса с вытеснением давно не читанных
+    записей."""
+
+    def __init__(self, timeout, max_entries=1024):
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class SharedResponseCache:
+    """Кэш ответов в общем хранилище Django (`CACHES`), например Redis или
+    Memcached, общий для всех процессов."""
+
+    key_prefix = 'response-cache'
+
+    def __init__(self, timeout, alias='default'):
+        self.timeout = timeout
+        self.cache = caches[alias]
+
+    @property
+    def generation_key(self):
+        return f'{self.key_prefix}:generation'
+
+    def make_key(self, key):
+        generation = self.cache.get(self.generation_key, 0)
+        return f'{self.key_prefix}:{generation}:{key}'
+
+    def get(self, key):
+        return self.cache.get(self.make_key(key))
+
+    def set(self, key, value):
+        self.cache.set(self.make_key(key), value, self.timeout)
+
+    def clear(self):
+        # Записи чужих ключей в общем кэше не трогаем: достаточно сменить
+        # поколение, и все старые ответы станут недостижимы. Поколение не
+        # должно истекать, иначе старые записи снова станут видны.
+        self.cache.add(self.generation_key, 0, None)
+        try:
+            self.cache.incr(self.generation_key)
+        except ValueError:
+            self.cache.set(self.generation_key, 1, None)
+
+
+_response_cache = None
+
+
+def get_response_cache():
+    global _response_cache
+    if _response_cache is None:
+        config = {
+            **DEFAULT_RESPONSE_CACHE,
+            **getattr(settings, 'RESPONSE_CACHE', {}),
+        }
+        backend = import_string(config['BACKEND'])
+        _response_cache = backend(config['TIMEOUT'], **config['OPTIONS'])
+    return _response_cache
+
+
+def get_role(user):
+    if not user.is_authenticated:
+        return 'anonymous'
+    if user.is_superuser:
+        return 'admin'
+    return user.role
+
+
+def make_key(request, models):
+    """Ключ ответа: путь с параметрами и тип ответа, роль пользователя и
+    версии таблиц (TableVersion) всех моделей, из которых собран ответ.
+    Версии хранятся в базе, поэтому запись в любом процессе делает старые
+    ответы недостижимыми во всех процессах. Версия сдвигается только после
+    фиксации записи, и строки до записи под новую версию не попадают."""
+    labels = [model._meta.label_lower for model in models]
+    versions = get_table_versions(request, models)
+    parts = [get_variant(request), get_role(request.user)]
+    parts += [
+        f'{label}={version}'
+        for label, (version, _) in zip(labels, versions)
+    ]
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+
+class CachedListMixin:
+    """Отдаёт список из кэша ответов, пока не изменилась ни одна из
+    моделей `cache_models`. На попадание в кэш уходит один запрос к
+    версиям таблиц.
+
+    Вместе с данными хранятся заголовки ETag и Last-Modified, поэтому
+    условный запрос к закэшированному списку тоже не обращается к базе."""
+
+    cache_models = ()
+    cached_headers = ('ETag', 'Last-Modified')
+
+    def list(self, request, *args, **kwargs):
+        key = make_key(request, self.cache_models)
+        cached = get_response_cache().get(key)
+        if cached is not None:
+            data, headers = cached
+            return self.get_cached_response(request, data, headers)
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            headers = {
+                name: response[name]
+                for name in self.cached_headers
+                if response.has_header(name)
+            }
+            get_response_cache().set(key, (response.data, headers))
+        return response
+
+    def get_cached_response(self, request, data, headers):
+        last_modified = headers.get('Last-Modified')
+        response = get_conditional_response(
+            request._request,
+            etag=headers.get('ETag'),
+            last_modified=last_modified and parse_http_date(last_modified),
+        )
+        if response is None:
+            response = Response(data)
+        for name, value in headers.items():
+            response[name] = value
+        patch_vary_headers(response, ('Accept',))
+        return response
+
+
+@receiver(post_migrate)
+def clear_on_migrate(sender, **kwargs):
+    # После flush версии таблиц начинаются заново, и старые ключи снова
+    # стали бы достижимы.
+    get_response_cache().clear()
+
+
+@receiver(setting_changed)
+def reset_on_setting_change(setting, **kwargs):
+    global _response_cache
+    if setting == 'RESPONSE_CACHE':
+        _response_cache = None
@@ -0,0 +1,128 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from reviews.models import TableVersion
+
+
+def get_variant(request):
+    """Путь с параметрами и согласованный тип ответа: JSON и HTML
+    браузерного API одного ресурса - разные представления со своими
+    ETag."""
+    return f'{request.get_full_path()}|{request.accepted_media_type}'
+
+
+def get_table_versions(request, models):
+    """Версии таблиц моделей (TableVersion.for_labels); за запрос к API
+    читаются из базы один раз."""
+    labels = tuple(model._meta.label_lower for model in models)
+    cached = getattr(request, '_table_versions', None)
+    if cached is None:
+        cached = request._table_versions = {}
+    if labels not in cached:
+        cached[labels] = TableVersion.objects.for_labels(labels)
+    return cached[labels]
+
+
+def get_validators(request, models):
+    """Строит ETag и Last-Modified по версиям таблиц, из которых собран
+    ответ. Строки самих объектов для этого не загружаются."""
+    labels = [model._meta.label_lower for model in models]
+    versions = get_table_versions(request, models)
+    parts = [get_variant(request)]
+    parts += [
+        f'{label}={version}' for label, (version, _) in zip(labels, versions)
+    ]
+    etag = quote_etag(hashlib.sha1('|'.join(parts).encode()).hexdigest())
+    modified = [modified for _, modified in versions if modified is not None]
+    last_modified = int(max(modified).timestamp()) if modified else None
+    return etag, last_modified
+
+
+def get_row(instance):
+    """Загруженные значения колонок объекта (отложенные поля не читаются)."""
+    if instance is None:
+        return ['None']
+    deferred = instance.get_deferred_fields()
+    return [instance._meta.label_lower] + [
+        repr(getattr(instance, field.attname))
+        for field in instance._meta.concrete_fields
+        if field.attname not in deferred
+    ]
+
+
+def get_loaded_related(instance, name):
+    """Связанные объекты name, если они загружены вместе с объектом
+    (select_related или prefetch_related), иначе None."""
+    field = instance._meta.get_field(name)
+    if field.many_to_many:
+        prefetched = getattr(instance, '_prefetched_objects_cache', {})
+        if name not in prefetched:
+            return None
+        return list(prefetched[name])
+    if not field.is_cached(instance):
+        return None
+    return [field.get_cached_value(instance)]
+
+
+def get_object_etag(request, instance, related=()):
+    """ETag одного объекта по значениям его строки и связанных объектов
+    related, загруженных для ответа. Изменения других строк тех же таблиц
+    его не меняют."""
+    parts = [get_variant(request)] + get_row(instance)
+    for name in related:
+        for obj in get_loaded_related(instance, name) or ():
+            parts += get_row(obj)
+    return quote_etag(hashlib.sha1('|'.join(parts).encode()).hexdigest())
+
+
+def set_validators(response, etag, last_modified):
+    patch_vary_headers(response, ('Accept',))
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+class ConditionalListMixin:
+    """Отвечает 304 на If-None-Match / If-Modified-Since для списка, не
+    выполняя запрос строк и сериализацию."""
+
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = get_validators(request, self.cache_models)
+        response = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
+
+
+class ConditionalRetrieveMixin:
+    """То же для одного объекта: объект загружается для проверки прав и
+    404, но сериализатор не вызывается. ETag строится по самому объекту и
+    связанным объектам etag_related, поэтому не устаревает от изменений
+    чужих строк; Last-Modified - по версиям таблиц cache_models."""
+
+    cache_models = ()
+    etag_related = ()
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        _, last_modified = get_validators(request, self.cache_models)
+        etag = get_object_etag(request, instance, self.etag_related)
+        response = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        return set_validators(response, etag, last_modified)
+
+
+class ConditionalGetMixin(ConditionalListMixin, ConditionalRetrieveMixin):
+    pass
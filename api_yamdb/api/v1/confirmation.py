@@ -0,0 +1,57 @@
+"""Коды подтверждения для получения JWT-токена.
+
+Код - отметка времени выпуска и HMAC от неё и данных пользователя, поэтому
+в базе он не хранится. Код действует CONFIRMATION_CODE_TIMEOUT секунд и
+только один раз: использованные коды до истечения их срока лежат в кэше
+CONFIRMATION_CODE_CACHE.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import base36_to_int, int_to_base36
+
+
+KEY_SALT = 'api.v1.confirmation'
+DEFAULT_TIMEOUT = 60 * 60 * 24
+
+
+def get_timeout():
+    return getattr(settings, 'CONFIRMATION_CODE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def get_used_codes_cache():
+    return caches[getattr(settings, 'CONFIRMATION_CODE_CACHE', 'default')]
+
+
+def get_signature(user, timestamp):
+    value = f'{user.pk}:{user.email}:{timestamp}'
+    return salted_hmac(KEY_SALT, value, algorithm='sha256').hexdigest()[:20]
+
+
+def make_code(user):
+    timestamp = int(time.time())
+    return f'{int_to_base36(timestamp)}-{get_signature(user, timestamp)}'
+
+
+def check_code(user, code):
+    """Проверяет код и отмечает его использованным. Повторная проверка
+    того же кода возвращает False."""
+    try:
+        timestamp, signature = str(code).split('-')
+        timestamp = base36_to_int(timestamp)
+    except ValueError:
+        return False
+    age = time.time() - timestamp
+    if not 0 <= age <= get_timeout():
+        return False
+    if not constant_time_compare(signature, get_signature(user, timestamp)):
+        return False
+    # Запись живёт ровно до истечения срока кода: позже код отвергается
+    # по времени, и помнить его уже не нужно.
+    return get_used_codes_cache().add(
+        f'used-confirmation-code:{user.pk}:{signature}',
+        True,
+        timeout=max(1, int(get_timeout() - age) + 1),
+    )
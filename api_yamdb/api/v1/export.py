@@ -0,0 +1,99 @@
+"""Выгрузка отзывов и комментариев в NDJSON (по объекту JSON на строку).
+
+Ответ передаётся потоком: объекты читаются из базы пачками по
+EXPORT_CHUNK_SIZE с условием `id > последний выданный`, поэтому память не
+растёт с размером выгрузки, а долгие запросы не держат открытый курсор.
+Прерванную выгрузку можно продолжить с `?after=<id последней строки>`.
+
+Под ASGI Django 3.2 перебирает потоковый ответ прямо в цикле событий, где
+ORM недоступен. Там каждая пачка читается в отдельном рабочем потоке, а
+цикл событий ждёт только одну пачку за раз.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.encoders import JSONEncoder
+
+from api.plans import get_plan
+
+CONTENT_TYPE = 'application/x-ndjson'
+AFTER_PARAM = 'after'
+
+
+def get_after(request):
+    try:
+        return int(request.query_params.get(AFTER_PARAM, 0))
+    except ValueError:
+        raise ValidationError({AFTER_PARAM: ['Ожидается целое число.']})
+
+
+def serialize_chunk(queryset, serializer_class):
+    plan = get_plan(serializer_class)
+    if plan is None:
+        return serializer_class(queryset, many=True).data
+    return plan.serialize(plan.values(queryset))
+
+
+def iter_chunks(queryset, serializer_class, after=0, chunk_size=None):
+    """Пачки строк NDJSON в порядке ключа, начиная после `after`.
+    Сериализатор должен выводить ключ объекта."""
+    if chunk_size is None:
+        chunk_size = getattr(settings, 'EXPORT_CHUNK_SIZE', 1000)
+    pk = queryset.model._meta.pk.name
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    queryset = queryset.order_by(pk)
+    while True:
+        items = serialize_chunk(
+            queryset.filter(pk__gt=after)[:chunk_size], serializer_class
+        )
+        if not items:
+            return
+        yield ''.join(encoder.encode(item) + '\n' for item in items).encode()
+        if len(items) < chunk_size:
+            return
+        after = items[-1][pk]
+
+
+def in_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def close_chunks(chunks):
+    try:
+        chunks.close()
+    finally:
+        connections.close_all()
+
+
+def iter_off_event_loop(chunks):
+    """Отдаёт пачки генератора chunks. Если ответ перебирается в цикле
+    событий (ASGI), генератор продвигается в рабочем потоке со своим
+    соединением с базой, которое закрывается в конце выгрузки."""
+    if not in_event_loop():
+        yield from chunks
+        return
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        while True:
+            chunk = executor.submit(next, chunks, None).result()
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        executor.submit(close_chunks, chunks).result()
+        executor.shutdown()
+
+
+def export_response(request, queryset, serializer_class):
+    chunks = iter_chunks(queryset, serializer_class, after=get_after(request))
+    return StreamingHttpResponse(
+        iter_off_event_loop(chunks), content_type=CONTENT_TYPE
+    )
@@ -1,4 +1,4 @@
-from django_filters.rest_framework import CharFilter, FilterSet
+from django_filters.rest_framework import CharFilter, FilterSet, NumberFilter
 
 from reviews.models import Title
 
@@ -6,7 +6,10 @@ from reviews.models import Title
 class TitlesFilter(FilterSet):
     category = CharFilter(field_name='category__slug')
     genre = CharFilter(field_name='genre__slug')
+    rating = NumberFilter(field_name='rating')
+    rating_min = NumberFilter(field_name='rating', lookup_expr='gte')
+    rating_max = NumberFilter(field_name='rating', lookup_expr='lte')
 
     class Meta:
         model = Title
-        fields = ('name', 'genre', 'category', 'year')
+        fields = ('name', 'genre', 'category', 'year', 'rating')
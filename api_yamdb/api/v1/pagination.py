@@ -0,0 +1,288 @@
+import base64
+import binascii
+import datetime
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+FALSE_VALUES = ('0', 'false', 'no', 'off')
+# Целые в курсоре ограничены 64 битами: SQLite не сообщает Django
+# диапазонов полей, и валидаторы границ для него пусты.
+MAX_CURSOR_INT = 2 ** 63
+
+
+def count_requested(request):
+    value = request.query_params.get('count', '')
+    return value.lower() not in FALSE_VALUES
+
+
+class CountablePageNumberPagination(PageNumberPagination):
+    """Постраничная пагинация, которая по `?count=false` не выполняет
+    COUNT(*), а определяет наличие следующей страницы по лишней строке."""
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.with_count = count_requested(request)
+        if self.with_count:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.request = request
+        try:
+            self.page_number = int(
+                request.query_params.get(self.page_query_param, 1)
+            )
+            if self.page_number < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound(self.invalid_page_message)
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        if not rows and self.page_number > 1:
+            raise NotFound(self.invalid_page_message)
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        if self.with_count:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if self.with_count:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.page_query_param, self.page_number + 1
+        )
+
+    def get_previous_link(self):
+        if self.with_count:
+            return super().get_previous_link()
+        if self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.page_query_param, self.page_number - 1
+        )
+
+    def get_html_context(self):
+        if self.with_count:
+            return super().get_html_context()
+        return {
+            'previous_url': self.get_previous_link(),
+            'next_url': self.get_next_link(),
+            'page_links': [],
+        }
+
+
+class KeysetPagination(BasePagination):
+    """Пагинация по ключу: страница выбирается условием на поля сортировки
+    (`id` или `pub_date, id`), а не через OFFSET.
+
+    Порядок берётся из атрибута `cursor_ordering` представления. Параметр
+    `ordering` в этом режиме не учитывается."""
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    ordering = ('id',)
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.with_count = count_requested(request)
+        self.ordering = tuple(getattr(view, 'cursor_ordering', self.ordering))
+        position, self.reverse = self.decode_cursor(request, queryset.model)
+
+        if self.with_count:
+            self.count = queryset.count()
+        prefix = '-' if self.reverse else ''
+        queryset = queryset.order_by(
+            *(prefix + field for field in self.ordering)
+        )
+        if position is not None:
+            queryset = queryset.filter(self.after(position, self.reverse))
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+            has_next, has_previous = position is not None, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+        self.next_position = self.previous_position = None
+        if rows:
+            if has_next:
+                self.next_position = self.get_position(rows[-1])
+            if has_previous:
+                self.previous_position = self.get_position(rows[0])
+        elif position is not None:
+            if self.reverse:
+                self.next_position = position
+            else:
+                self.previous_position = position
+        return rows
+
+    def after(self, position, reverse=False):
+        lookup = 'lt' if reverse else 'gt'
+        condition = Q()
+        for index in range(len(self.ordering) - 1, -1, -1):
+            field = self.ordering[index]
+            step = Q(**{f'{field}__{lookup}': position[index]})
+            if index < len(self.ordering) - 1:
+                step |= Q(**{field: position[index]}) & condition
+            condition = step
+        return condition
+
+    def get_position(self, item):
+        position = []
+        for field in self.ordering:
+            if isinstance(item, dict):
+                value = item[field]
+            else:
+                value = getattr(item, field)
+            if isinstance(value, datetime.datetime):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            cursor = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            position = cursor['p']
+            reverse = bool(cursor.get('r'))
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(position, list)
+            or len(position) != len(self.ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return self.clean_position(position, model), reverse
+
+    def clean_position(self, position, model):
+        """Значения курсора приводятся полями модели: подделанный курсор
+        даёт 404, а не ошибку базы."""
+        cleaned = []
+        for name, value in zip(self.ordering, position):
+            field = model._meta.get_field(name)
+            if value is None:
+                raise NotFound(self.invalid_cursor_message)
+            try:
+                value = field.to_python(value)
+                field.run_validators(value)
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+            if (
+                isinstance(value, int)
+                and not -MAX_CURSOR_INT <= value < MAX_CURSOR_INT
+            ):
+                raise NotFound(self.invalid_cursor_message)
+            cleaned.append(value)
+        return cleaned
+
+    def encode_cursor(self, position, reverse):
+        cursor = {'p': position}
+        if reverse:
+            cursor['r'] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(cursor, separators=(',', ':')).encode()
+        ).decode().rstrip('=')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, True)
+
+    def get_paginated_response(self, data):
+        fields = [
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]
+        if self.with_count:
+            fields.insert(0, ('count', self.count))
+        return Response(OrderedDict(fields))
+
+
+class PageOrCursorPagination(CountablePageNumberPagination):
+    """Пагинация по умолчанию для списков api/v1.
+
+    Работает как постраничная, а при `?pagination=cursor` или переданном
+    `cursor` переключается на пагинацию по ключу."""
+
+    mode_query_param = 'pagination'
+    cursor_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_class.cursor_query_param in request.query_params
+        ):
+            self.cursor_paginator = self.cursor_class()
+            self.display_page_controls = False
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters += [
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'cursor - пагинация по ключу.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.cursor_class.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Курсор страницы.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': 'count',
+                'required': False,
+                'in': 'query',
+                'description': 'false - не считать общее количество.',
+                'schema': {'type': 'boolean'},
+            },
+        ]
+        return parameters
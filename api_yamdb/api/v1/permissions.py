@@ -21,8 +21,9 @@ class AccessOrReadOnly(BasePermission):
         if request.method == 'POST':
             return request.user.is_authenticated
 
+        # Автор сравнивается по id: строка пользователя не загружается.
         return request.user.is_authenticated and (
-            request.user == obj.author
+            obj.author_id == request.user.pk
             or request.user.is_moderator
             or request.user.is_admin
         )
@@ -1,10 +1,18 @@
+from django.conf import settings
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.core.validators import RegexValidator
+from django.db import transaction
+from django.db.models import Q
 from rest_framework.serializers import (
     CharField,
     EmailField,
+    FloatField,
     IntegerField,
+    ListField,
+    ListSerializer,
     ModelSerializer,
+    Serializer,
+    SlugField,
     SlugRelatedField,
     ValidationError,
 )
@@ -18,6 +26,7 @@ from reviews.models import (
     Title,
     User,
 )
+from reviews.signals import bulk_changed
 
 
 class CategorySerializer(ModelSerializer):
@@ -32,14 +41,42 @@ class GenreSerializer(ModelSerializer):
         fields = ('name', 'slug')
 
 
+class StatisticsSerializer(Serializer):
+    title_count = IntegerField()
+    review_count = IntegerField()
+    rating = FloatField()
+
+
+class CategoryStatisticsSerializer(CategorySerializer):
+    stats = StatisticsSerializer(source='statistics', read_only=True)
+
+    class Meta(CategorySerializer.Meta):
+        fields = CategorySerializer.Meta.fields + ('stats',)
+
+
+class GenreStatisticsSerializer(GenreSerializer):
+    stats = StatisticsSerializer(source='statistics', read_only=True)
+
+    class Meta(GenreSerializer.Meta):
+        fields = GenreSerializer.Meta.fields + ('stats',)
+
+
 class TitleSerializer(ModelSerializer):
     category = CategorySerializer()
     genre = GenreSerializer(many=True)
-    rating = IntegerField(source='reviews__score__avg', read_only=True)
+    rating = IntegerField(read_only=True)
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = (
+            'id',
+            'name',
+            'year',
+            'rating',
+            'description',
+            'genre',
+            'category',
+        )
 
 
 class TitleCreateUpdateSerializer(ModelSerializer):
@@ -53,22 +90,140 @@ class TitleCreateUpdateSerializer(ModelSerializer):
         required=True,
     )
     description = CharField(required=False)
+    rating = IntegerField(read_only=True)
 
     class Meta:
         model = Title
-        fields = '__all__'
-        read_only_fields = ('rating',)
+        fields = (
+            'id',
+            'name',
+            'year',
+            'rating',
+            'description',
+            'genre',
+            'category',
+        )
 
     def create(self, validated_data):
-        category = validated_data.pop('category')
         genres = validated_data.pop('genre')
-        title = Title.objects.create(**validated_data, category=category)
-        for genre in genres:
-            genre = Genre.objects.get(slug=genre.slug)
-            GenreTitle.objects.create(genre=genre, title=title)
+        with transaction.atomic():
+            title = Title.objects.create(**validated_data)
+            links = GenreTitle.objects.bulk_create(
+                GenreTitle(genre=genre, title=title)
+                for genre in dict.fromkeys(genres)
+            )
+            bulk_changed.send(sender=GenreTitle, objects=links)
         return title
 
 
+class TitleBulkCreateSerializer(ListSerializer):
+    """Создаёт список произведений: слаги категорий и жанров всех
+    элементов разрешаются одним запросом на таблицу, произведения и связи
+    с жанрами вставляются пачками в одной транзакции.
+
+    Некорректные элементы не прерывают загрузку, их ошибки собираются в
+    `item_errors` с индексом элемента."""
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list) or not data:
+            raise ValidationError('Ожидается непустой список произведений.')
+        if len(data) > settings.BULK_TITLES_LIMIT:
+            raise ValidationError(
+                'За один запрос можно создать не больше '
+                f'{settings.BULK_TITLES_LIMIT} произведений.'
+            )
+        self.item_errors = []
+        items = []
+        for index, item in enumerate(data):
+            try:
+                items.append((index, self.child.run_validation(item)))
+            except ValidationError as error:
+                self.item_errors.append(
+                    {'index': index, 'errors': error.detail}
+                )
+        return self.resolve_slugs(items)
+
+    def resolve_slugs(self, items):
+        categories = Category.objects.in_bulk(
+            {item['category'] for _, item in items}, field_name='slug'
+        )
+        genres = Genre.objects.in_bulk(
+            {slug for _, item in items for slug in item['genre']},
+            field_name='slug',
+        )
+        resolved = []
+        for index, item in items:
+            errors = {}
+            if item['category'] not in categories:
+                errors['category'] = [
+                    f'Категория {item["category"]} не найдена.'
+                ]
+            missing = [slug for slug in item['genre'] if slug not in genres]
+            if missing:
+                errors['genre'] = [
+                    f'Жанр {slug} не найден.' for slug in missing
+                ]
+            if errors:
+                self.item_errors.append({'index': index, 'errors': errors})
+                continue
+            resolved.append({
+                **item,
+                'category': categories[item['category']],
+                'genre': [genres[slug] for slug in dict.fromkeys(
+                    item['genre']
+                )],
+            })
+        self.item_errors.sort(key=lambda error: error['index'])
+        return resolved
+
+    def create(self, validated_data):
+        titles = [
+            Title(
+                name=item['name'],
+                year=item['year'],
+                description=item.get('description', ''),
+                category=item['category'],
+            )
+            for item in validated_data
+        ]
+        with transaction.atomic():
+            Title.objects.bulk_create_with_ids(titles)
+            links = GenreTitle.objects.bulk_create(
+                GenreTitle(genre=genre, title=title)
+                for title, item in zip(titles, validated_data)
+                for genre in item['genre']
+            )
+            bulk_changed.send(sender=Title, objects=titles)
+            bulk_changed.send(sender=GenreTitle, objects=links)
+        for title, item in zip(titles, validated_data):
+            title.created_genres = item['genre']
+        return titles
+
+
+class TitleBulkItemSerializer(ModelSerializer):
+    category = SlugField(max_length=50)
+    genre = ListField(child=SlugField(max_length=50), allow_empty=False)
+    description = CharField(required=False)
+
+    class Meta:
+        model = Title
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
+        list_serializer_class = TitleBulkCreateSerializer
+
+    def to_representation(self, title):
+        # Тот же формат, что у TitleCreateUpdateSerializer, но без
+        # запросов жанров каждого созданного произведения.
+        return {
+            'id': title.id,
+            'name': title.name,
+            'year': title.year,
+            'rating': None,
+            'description': title.description,
+            'genre': [genre.slug for genre in title.created_genres],
+            'category': title.category.slug,
+        }
+
+
 class ReviewSerializer(ModelSerializer):
     author = SlugRelatedField(slug_field='username', read_only=True)
 
@@ -81,7 +236,9 @@ class ReviewSerializer(ModelSerializer):
             return data
         user = self.context['request'].user
         title_id = self.context['request'].parser_context['kwargs']['title_id']
-        if Review.objects.filter(author=user, title__id=title_id).exists():
+        if Review.objects.filter(
+            author_id=user.pk, title_id=title_id
+        ).exists():
             raise ValidationError(
                 'Это ошибка, вызванная тем, что нельзя оставлять'
                 'два отзыва на одно произведение'
@@ -97,6 +254,20 @@ class CommentSerializer(ModelSerializer):
         fields = ('id', 'text', 'author', 'pub_date')
 
 
+class ReviewExportSerializer(ReviewSerializer):
+    title = IntegerField(source='title_id', read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ('id', 'title', 'text', 'author', 'score', 'pub_date')
+
+
+class CommentExportSerializer(CommentSerializer):
+    review = IntegerField(source='review_id', read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = ('id', 'review', 'text', 'author', 'pub_date')
+
+
 class UserSerializer(ModelSerializer):
     class Meta:
         model = User
@@ -132,15 +303,19 @@ class SignUpSerializer(ModelSerializer):
     email = EmailField(max_length=254)
 
     def create(self, validated_data):
-        existing_user_by_username = User.objects.filter(
-            username=validated_data.get('username')
-        ).first()
-        existing_user_by_email = User.objects.filter(
-            email=validated_data.get('email')
-        ).first()
-        if any([existing_user_by_username, existing_user_by_email]):
-            if existing_user_by_username == existing_user_by_email:
-                return existing_user_by_username
+        username = validated_data.get('username')
+        email = validated_data.get('email')
+        existing_users = list(
+            User.objects.filter(Q(username=username) | Q(email=email))[:2]
+        )
+        if existing_users:
+            user = existing_users[0]
+            if (
+                len(existing_users) == 1
+                and user.username == username
+                and user.email == email
+            ):
+                return user
             raise ValidationError(
                 'Email уже зарегистрирован для другого пользователя.'
             )
@@ -0,0 +1,161 @@
+"""Ограничение частоты запросов по алгоритму token bucket.
+
+Ведро на каждую пару (область, ключ): ключ - id пользователя или, для
+анонимных запросов и представлений с `throttle_by = 'ip'`, IP-адрес
+(X-Forwarded-For учитывается только при REST_FRAMEWORK['NUM_PROXIES']).
+Область - `throttle_scope` представления и вид запроса: `<scope>.read`
+или `<scope>.write`. Частота берётся из REST_FRAMEWORK
+['DEFAULT_THROTTLE_RATES'] по ключу области, а если его нет - по ключу
+`read`/`write`. Частота `N/период` означает ведро на N запросов, которое
+заполняется за период.
+
+Состояние вёдер хранится в бэкенде из настройки THROTTLE_STORE:
+LRUBucketStore - в памяти процесса, SharedBucketStore - в общем кэше
+Django.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+DEFAULT_THROTTLE_STORE = {
+    'BACKEND': 'api.v1.throttling.LRUBucketStore',
+    'OPTIONS': {},
+}
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60)."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+def take_token(bucket, capacity, period, now):
+    """Возвращает новое состояние ведра и время ожидания в секундах: 0,
+    если запрос разрешён."""
+    refill = capacity / period
+    tokens, updated = bucket or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * refill)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / refill
+
+
+class LRUBucketStore:
+    """Вёдра в памяти процесса. Хранится не больше `max_entries` вёдер;
+    давно не использованные вытесняются, что равносильно полному ведру."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def consume(self, key, capacity, period):
+        with self.lock:
+            bucket, wait = take_token(
+                self.buckets.get(key), capacity, period, time.monotonic()
+            )
+            self.buckets[key] = bucket
+            self.buckets.move_to_end(key)
+            while len(self.buckets) > self.max_entries:
+                self.buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class SharedBucketStore:
+    """Вёдра в общем кэше Django (`CACHES`), общие для всех процессов.
+
+    Чтение и запись ведра не атомарны: при одновременных запросах с одним
+    ключом лимит может быть превышен на число таких запросов."""
+
+    key_prefix = 'throttle'
+
+    def __init__(self, alias='default'):
+        self.cache = caches[alias]
+
+    @property
+    def generation_key(self):
+        return f'{self.key_prefix}:generation'
+
+    def consume(self, key, capacity, period):
+        generation = self.cache.get(self.generation_key, 0)
+        key = f'{self.key_prefix}:{generation}:{key}'
+        bucket, wait = take_token(
+            self.cache.get(key), capacity, period, time.time()
+        )
+        # Через период ведро заполнится само, хранить его дольше незачем.
+        self.cache.set(key, bucket, period)
+        return wait
+
+    def clear(self):
+        # В общем кэше лежат и чужие ключи (использованные коды, отзыв
+        # токенов): меняется только поколение вёдер, старые истекут сами.
+        self.cache.add(self.generation_key, 0, None)
+        try:
+            self.cache.incr(self.generation_key)
+        except ValueError:
+            self.cache.set(self.generation_key, 1, None)
+
+
+_bucket_store = None
+
+
+def get_bucket_store():
+    global _bucket_store
+    if _bucket_store is None:
+        config = {
+            **DEFAULT_THROTTLE_STORE,
+            **getattr(settings, 'THROTTLE_STORE', {}),
+        }
+        backend = import_string(config['BACKEND'])
+        _bucket_store = backend(**config['OPTIONS'])
+    return _bucket_store
+
+
+@receiver(setting_changed)
+def reset_on_setting_change(setting, **kwargs):
+    global _bucket_store
+    if setting == 'THROTTLE_STORE':
+        _bucket_store = None
+
+
+class ScopedBucketThrottle(BaseThrottle):
+    def allow_request(self, request, view):
+        self.wait_seconds = 0
+        scope = getattr(view, 'throttle_scope', None)
+        if scope is None:
+            return True
+        kind = 'read' if request.method in SAFE_METHODS else 'write'
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        rate = rates.get(f'{scope}.{kind}', rates.get(kind))
+        if rate is None:
+            return True
+        capacity, period = parse_rate(rate)
+        key = f'{scope}.{kind}:{self.get_key(request, view)}'
+        self.wait_seconds = get_bucket_store().consume(key, capacity, period)
+        return not self.wait_seconds
+
+    def get_key(self, request, view):
+        if (
+            request.user.is_authenticated
+            and getattr(view, 'throttle_by', 'user') == 'user'
+        ):
+            return f'user-{request.user.pk}'
+        return f'ip-{self.get_ident(request)}'
+
+    def wait(self):
+        return self.wait_seconds
@@ -1,11 +1,17 @@
-from django.urls import include, path
+from django.conf import settings
+from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 
+from api.v1 import async_views
 from api.v1.views import (
     CategoriesViewSet,
+    CommentExportView,
     CommentViewSet,
     GenresViewSet,
+    MetricsView,
+    ReviewExportView,
     ReviewViewSet,
+    SearchView,
     SignUPView,
     TitlesViewSet,
     TokenView,
@@ -28,6 +34,17 @@ router.register('genres', GenresViewSet, basename='genres')
 router.register('titles', TitlesViewSet, basename='titles')
 router.register('users', UserViewSet, basename='users')
 
+# Под ASGI списки обслуживаются асинхронными представлениями; маршруты
+# стоят перед маршрутами роутера и перекрывают их.
+async_urlpatterns = [
+    re_path(r'^titles/$', async_views.titles),
+    re_path(r'^titles/(?P<title_id>\d+)/reviews/$', async_views.reviews),
+    re_path(
+        r'^titles/(?P<title_id>\d+)/reviews/(?P<review_id>\d+)/comments/$',
+        async_views.comments,
+    ),
+]
+
 urlpatterns = [
     path(
         'auth/',
@@ -38,5 +55,10 @@ urlpatterns = [
             ]
         ),
     ),
+    path('metrics/', MetricsView.as_view()),
+    path('search/', SearchView.as_view()),
+    path('reviews/export/', ReviewExportView.as_view()),
+    path('comments/export/', CommentExportView.as_view()),
+    *(async_urlpatterns if settings.ASYNC_READ_VIEWS else []),
     path('', include(router.urls)),
 ]
@@ -1,14 +1,12 @@
 from django.conf import settings
-from django.core.mail import send_mail
-from django.db.models import Avg
-from django.contrib.auth.tokens import default_token_generator
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
-from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework.views import APIView
 from rest_framework import (
     filters,
@@ -17,36 +15,76 @@ from rest_framework import (
     viewsets,
 )
 
+from api.v1 import confirmation, export
+from api.v1.authentication import (
+    ClaimsAccessToken,
+    get_author,
+    get_user_instance,
+)
+from api.v1.cache import CachedListMixin
+from api.v1.conditional import ConditionalGetMixin, ConditionalListMixin
 from api.v1.filters import TitlesFilter
-from api.mixins import ListCreateDestroyViewSet
+from api.v1.pagination import PageOrCursorPagination
+from api import metrics
+from api.mixins import (
+    AtomicWriteMixin,
+    FastListMixin,
+    ListCreateDestroyViewSet,
+    ParentObjectMixin,
+    SerializerTimingMixin,
+    SparseFieldsMixin,
+    StatisticsMixin,
+)
 from api.v1.permissions import ReadOnly, AdminRules, AccessOrReadOnly
 from api.v1.serializers import (
     CategorySerializer,
+    CategoryStatisticsSerializer,
+    CommentExportSerializer,
     CommentSerializer,
     GenreSerializer,
+    GenreStatisticsSerializer,
     ProfileSerializer,
+    ReviewExportSerializer,
     ReviewSerializer,
+    TitleBulkItemSerializer,
     TitleCreateUpdateSerializer,
     TitleSerializer,
     SignUpSerializer,
     TokenSerializer,
     UserSerializer,
 )
-from reviews.models import Category, Genre, Review, Title, User
+from reviews import mail, search
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    GenreTitle,
+    Review,
+    Title,
+    User,
+)
 
 
 HTTP_METHOD = ('get', 'post', 'patch', 'delete')
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    SerializerTimingMixin,
+    AtomicWriteMixin,
+    viewsets.ModelViewSet,
+):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (AdminRules,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('username',)
-    pagination_class = PageNumberPagination
+    pagination_class = PageOrCursorPagination
     http_method_names = HTTP_METHOD
     lookup_field = 'username'
+    cache_models = (User,)
+    throttle_scope = 'users'
 
     @action(
         detail=False,
@@ -57,48 +95,52 @@ class UserViewSet(viewsets.ModelViewSet):
     def me(self, request):
         if request.method == 'PATCH':
             serializer = self.get_serializer(
-                request.user, data=request.data, partial=True
+                get_user_instance(request.user),
+                data=request.data,
+                partial=True,
             )
             try:
                 serializer.is_valid(raise_exception=True)
             except ValidationError as e:
                 return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
-            serializer.save()
+            with transaction.atomic():
+                serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
 
-        serializer = self.get_serializer(request.user)
+        serializer = self.get_serializer(get_user_instance(request.user))
         return Response(serializer.data)
 
 
 class SignUPView(APIView):
+    throttle_scope = 'signup'
+    throttle_by = 'ip'
+
     def post(self, request):
         serializer = SignUpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
-        confirmation_code = default_token_generator.make_token(user)
-        user.confirmation_code = (
-            confirmation_code  # Присвоение значения confirmation_code
-        )
-        user.save()  # Сохранение пользователя с заполненным confirmation_code
-        send_mail(
+        confirmation_code = confirmation.make_code(user)
+        mail.enqueue(
             subject='Confirmation code',
             message=f'{confirmation_code}',
             from_email=settings.FROM_EMAIL,
             recipient_list=[user.email],
-            fail_silently=False,
         )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 class TokenView(APIView):
+    throttle_scope = 'token'
+    throttle_by = 'ip'
+
     def post(self, request):
         serializer = TokenSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         username = serializer.validated_data.get('username')
         confirmation_code = serializer.validated_data.get('confirmation_code')
         user = get_object_or_404(User, username=username)
-        if user.confirmation_code == confirmation_code:
-            jwt_token = AccessToken.for_user(user)
+        if confirmation.check_code(user, confirmation_code):
+            jwt_token = ClaimsAccessToken.for_user(user)
             return Response(
                 {'token': f'{jwt_token}'}, status=status.HTTP_200_OK
             )
@@ -112,85 +154,233 @@ class TokenView(APIView):
         )
 
 
-class CategoriesViewSet(ListCreateDestroyViewSet):
+class MetricsView(APIView):
+    permission_classes = (AdminRules,)
+    throttle_scope = 'metrics'
+
+    def get(self, request):
+        return HttpResponse(
+            metrics.render(), content_type=metrics.CONTENT_TYPE
+        )
+
+
+class SearchView(APIView):
+    max_limit = 100
+    throttle_scope = 'search'
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': ['Укажите строку поиска.']})
+        kinds = request.query_params.get('type')
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            raise ValidationError({'limit': ['Ожидается целое число.']})
+        results = search.search(
+            query,
+            kinds=kinds.split(',') if kinds else None,
+            limit=min(max(limit, 1), self.max_limit),
+        )
+        return Response({'results': results})
+
+
+class ExportView(APIView):
+    """Выгрузка всех объектов `queryset` в NDJSON (api.v1.export)."""
+
+    permission_classes = (AdminRules,)
+    throttle_scope = 'export'
+    queryset = None
+    serializer_class = None
+
+    def get(self, request):
+        return export.export_response(
+            request, self.queryset.all(), self.serializer_class
+        )
+
+
+class ReviewExportView(ExportView):
+    queryset = Review.objects.all()
+    serializer_class = ReviewExportSerializer
+
+
+class CommentExportView(ExportView):
+    queryset = Comment.objects.all()
+    serializer_class = CommentExportSerializer
+
+
+class CategoriesViewSet(
+    SparseFieldsMixin,
+    StatisticsMixin,
+    CachedListMixin,
+    ConditionalListMixin,
+    ListCreateDestroyViewSet,
+):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    stats_serializer_class = CategoryStatisticsSerializer
     permission_classes = [ReadOnly | AdminRules]
-    pagination_class = PageNumberPagination
+    pagination_class = PageOrCursorPagination
     filter_backends = (filters.SearchFilter, filters.OrderingFilter)
     search_fields = ('name',)
     lookup_field = 'slug'
     ordering = ('id',)
+    cache_models = (Category,)
+    stats_cache_models = (Title, Review)
+    throttle_scope = 'catalog'
 
 
-class GenresViewSet(ListCreateDestroyViewSet):
+class GenresViewSet(
+    SparseFieldsMixin,
+    StatisticsMixin,
+    CachedListMixin,
+    ConditionalListMixin,
+    ListCreateDestroyViewSet,
+):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    stats_serializer_class = GenreStatisticsSerializer
     permission_classes = [ReadOnly | AdminRules]
+    pagination_class = PageOrCursorPagination
     lookup_field = 'slug'
     filter_backends = (filters.SearchFilter, filters.OrderingFilter)
     search_fields = ('name',)
     ordering = ('id',)
+    cache_models = (Genre,)
+    stats_cache_models = (Title, GenreTitle, Review)
+    throttle_scope = 'catalog'
 
 
-class TitlesViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(Avg('reviews__score'))
+class TitlesViewSet(
+    CachedListMixin,
+    ConditionalGetMixin,
+    FastListMixin,
+    SerializerTimingMixin,
+    AtomicWriteMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = Title.objects.select_related('category').prefetch_related(
+        Prefetch('genre', queryset=Genre.objects.order_by('id'))
+    )
     serializer_class = TitleSerializer
     permission_classes = [ReadOnly | AdminRules]
+    pagination_class = PageOrCursorPagination
     filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
     http_method_names = HTTP_METHOD
     filterset_class = TitlesFilter
+    ordering_fields = ('id', 'name', 'year', 'rating')
     ordering = ('id',)
+    cache_models = (Title, Category, Genre, GenreTitle, Review)
+    etag_related = ('category', 'genre')
+    throttle_scope = 'catalog'
 
     def get_serializer_class(self):
         if self.action in ['create', 'partial_update']:
             return TitleCreateUpdateSerializer
+        if self.action == 'bulk':
+            return TitleBulkItemSerializer
         return TitleSerializer
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        if not serializer.validated_data:
+            return Response(
+                {'created': [], 'errors': serializer.item_errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer.save()
+        return Response(
+            {'created': serializer.data, 'errors': serializer.item_errors},
+            status=status.HTTP_201_CREATED,
+        )
+
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    ParentObjectMixin,
+    ConditionalGetMixin,
+    FastListMixin,
+    SerializerTimingMixin,
+    AtomicWriteMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = Review.objects.select_related('author')
     serializer_class = ReviewSerializer
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
         AccessOrReadOnly,
     )
-    pagination_class = PageNumberPagination
+    pagination_class = PageOrCursorPagination
     http_method_names = HTTP_METHOD
     filter_backends = (filters.OrderingFilter,)
     ordering = ('id',)
-
-    def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        return title.reviews.all()
+    cursor_ordering = ('pub_date', 'id')
+    cache_models = (Review, User)
+    etag_related = ('author',)
+    throttle_scope = 'reviews'
+    parent_model = Title
+    parent_lookups = {'title_id': 'title_id'}
+    parent_filters = {'id': 'title_id'}
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(
+            author=get_author(self.request.user), title=self.get_parent()
+        )
+
+    @action(
+        detail=False,
+        permission_classes=(AdminRules,),
+        throttle_scope='export',
+    )
+    def export(self, request, title_id=None):
+        self.check_parent_exists()
+        return export.export_response(
+            request, self.get_queryset(), ReviewExportSerializer
+        )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ParentObjectMixin,
+    ConditionalGetMixin,
+    FastListMixin,
+    SerializerTimingMixin,
+    AtomicWriteMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = Comment.objects.select_related('author')
     serializer_class = CommentSerializer
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
         AccessOrReadOnly,
     )
-    pagination_class = PageNumberPagination
+    pagination_class = PageOrCursorPagination
     http_method_names = HTTP_METHOD
     filter_backends = (filters.OrderingFilter,)
     ordering = ('id',)
+    cursor_ordering = ('pub_date', 'id')
+    cache_models = (Comment, User)
+    etag_related = ('author',)
+    throttle_scope = 'comments'
+    parent_model = Review
+    parent_lookups = {
+        'review_id': 'review_id',
+        'review__title_id': 'title_id',
+    }
+    parent_filters = {'id': 'review_id', 'title_id': 'title_id'}
 
     def perform_create(self, serializer):
-        review = get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id'),
-            title__id=self.kwargs.get('title_id'),
+        serializer.save(
+            author=get_author(self.request.user), review=self.get_parent()
         )
-        serializer.save(author=self.request.user, review=review)
 
-    def get_queryset(self):
-        review = get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id'),
-            title__id=self.kwargs.get('title_id'),
+    @action(
+        detail=False,
+        permission_classes=(AdminRules,),
+        throttle_scope='export',
+    )
+    def export(self, request, title_id=None, review_id=None):
+        self.check_parent_exists()
+        return export.export_response(
+            request, self.get_queryset(), CommentExportSerializer
         )
-        return review.comments.all()
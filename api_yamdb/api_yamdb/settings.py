@@ -30,6 +30,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -95,13 +96,95 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.v1.authentication.ClaimsJWTAuthentication',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.v1.pagination.PageOrCursorPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.v1.throttling.ScopedBucketThrottle',
+    ],
+    # Ключи: '<throttle_scope>.read|write' или общие 'read' и 'write'.
+    'DEFAULT_THROTTLE_RATES': {
+        'read': '600/min',
+        'write': '60/min',
+        'signup.write': '20/hour',
+        'token.write': '30/min',
+        'search.read': '120/min',
+        'export.read': '30/min',
+        'metrics.read': '60/min',
+    },
+    # Число обратных прокси перед приложением: адрес клиента для лимитов
+    # берётся из X-Forwarded-For только на столько позиций с конца. При 0
+    # заголовок не учитывается, и клиент не может подменить свой адрес.
+    'NUM_PROXIES': 0,
     'ACCESS_TOKEN_LIFETIME': timedelta(days=365),
 }
 
+# Максимальное число произведений в POST /api/v1/titles/bulk/
+
+BULK_TITLES_LIMIT = 5000
+
+# Размер пачки потоковой выгрузки NDJSON (api.v1.export)
+
+EXPORT_CHUNK_SIZE = 1000
+
+# Кэш ответов каталога (api.v1.cache). Ключи строятся по версиям таблиц в
+# базе, поэтому кэш в памяти процесса корректен и при нескольких процессах;
+# 'api.v1.cache.SharedResponseCache' с общим бэкендом в CACHES позволяет
+# процессам делить сами записи.
+
+RESPONSE_CACHE = {
+    'BACKEND': 'api.v1.cache.LRUResponseCache',
+    'TIMEOUT': 60,
+    'OPTIONS': {'max_entries': 1024},
+}
+
+# Хранилище вёдер ограничения частоты запросов (api.v1.throttling). При
+# нескольких процессах - 'api.v1.throttling.SharedBucketStore' с общим
+# бэкендом в CACHES.
+
+THROTTLE_STORE = {
+    'BACKEND': 'api.v1.throttling.LRUBucketStore',
+    'OPTIONS': {'max_entries': 10000},
+}
+
+# Списки произведений, отзывов и комментариев сериализуются по плану из
+# строк values() (api.plans), без экземпляров моделей.
+
+FAST_LIST_SERIALIZERS = True
+
+# Асинхронные представления списков (api.v1.async_views) для запуска под
+# ASGI: YAMDB_ASYNC_VIEWS=1. Под WSGI они только добавили бы цикл событий на
+# каждый запрос. Выигрыш есть, если чтение упирается в ожидание базы, а не в
+# процессор; сравнение - benchmarks/asgi_wsgi.py.
+
+ASYNC_READ_VIEWS = os.getenv('YAMDB_ASYNC_VIEWS') == '1'
+
+# Очередь исходящей почты (reviews.mail). Письма отправляет команда
+# send_queued_mail; при MAIL_QUEUE_EAGER = True - сразу при постановке в
+# очередь. Задержка перед повтором удваивается с каждой попыткой. Выбранные
+# письма захватываются на MAIL_QUEUE_CLAIM_TIMEOUT секунд, так что
+# отправителей может быть несколько.
+
+MAIL_QUEUE_EAGER = False
+MAIL_QUEUE_BATCH_SIZE = 100
+MAIL_QUEUE_MAX_ATTEMPTS = 5
+MAIL_QUEUE_RETRY_DELAY = 60
+MAIL_QUEUE_CLAIM_TIMEOUT = 300
+
+# Срок действия кода подтверждения в секундах (api.v1.confirmation) и кэш,
+# в котором хранятся использованные коды. При нескольких процессах кэш
+# должен быть общим.
+
+CONFIRMATION_CODE_TIMEOUT = 60 * 60 * 24
+CONFIRMATION_CODE_CACHE = 'default'
+
+# Кэш отметок об изменении роли пользователя (api.v1.authentication). При
+# нескольких процессах кэш должен быть общим, иначе понижение роли дойдёт
+# до других процессов только с истечением токена.
+
+AUTH_REVOCATIONS_CACHE = 'default'
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 FROM_EMAIL = None
@@ -1,5 +1,14 @@
 from django.contrib import admin
-from reviews.models import Category, Genre, GenreTitle, Title, User
+from reviews.models import (
+    Category,
+    CategoryStatistics,
+    Genre,
+    GenreStatistics,
+    GenreTitle,
+    OutgoingEmail,
+    Title,
+    User,
+)
 
 
 class CategoryAdmin(admin.ModelAdmin):
@@ -13,7 +22,14 @@ class GenreAdmin(admin.ModelAdmin):
 
 
 class TitleAdmin(admin.ModelAdmin):
-    list_display = ('id', 'name', 'year', 'description', 'category')
+    list_display = (
+        'id',
+        'name',
+        'year',
+        'description',
+        'category',
+        'rating',
+    )
     search_fields = ('text',)
     list_filter = ('year',)
     empty_value_display = '-пусто-'
@@ -26,11 +42,15 @@ class GenreTitleAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
+class StatisticsAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title_count', 'review_count', 'rating')
+    readonly_fields = ('title_count', 'review_count', 'rating_sum', 'rating')
+
+
 class UserAdmin(admin.ModelAdmin):
     list_display = (
         'username',
         'email',
-        'confirmation_code',
         'role',
         'date_joined',
     )
@@ -38,8 +58,25 @@ class UserAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'subject',
+        'recipients',
+        'status',
+        'attempts',
+        'send_after',
+        'sent',
+    )
+    list_filter = ('status',)
+    empty_value_display = '-пусто-'
+
+
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Genre, GenreAdmin)
 admin.site.register(Title, TitleAdmin)
 admin.site.register(GenreTitle, GenreTitleAdmin)
 admin.site.register(User, UserAdmin)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
+admin.site.register(GenreStatistics, StatisticsAdmin)
+admin.site.register(CategoryStatistics, StatisticsAdmin)
@@ -0,0 +1,150 @@
+"""Очередь исходящей почты.
+
+Письмо сохраняется в таблицу OutgoingEmail, а отправляет его команда
+`send_queued_mail`: пачками через одно соединение с почтовым сервером.
+Неудачная отправка повторяется с удваивающейся задержкой, после
+MAIL_QUEUE_MAX_ATTEMPTS попыток письмо помечается как неотправленное.
+При MAIL_QUEUE_EAGER письмо отправляется сразу при постановке в очередь.
+
+Перед отправкой письма захватываются: срок отправки сдвигается на
+MAIL_QUEUE_CLAIM_TIMEOUT условным UPDATE, поэтому несколько
+отправителей не выбирают одно письмо дважды. Если отправитель упал, не
+записав результат, письмо снова попадёт в очередь по истечении срока.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from reviews.models import OutgoingEmail
+
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_DELAY = 60
+DEFAULT_CLAIM_TIMEOUT = 300
+
+
+def get_setting(name, default):
+    return getattr(settings, f'MAIL_QUEUE_{name}', default)
+
+
+def get_claim_deadline():
+    return timezone.now() + timedelta(
+        seconds=get_setting('CLAIM_TIMEOUT', DEFAULT_CLAIM_TIMEOUT)
+    )
+
+
+def enqueue(subject, message, recipient_list, from_email=None):
+    eager = get_setting('EAGER', False)
+    email = OutgoingEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email,
+        recipients=list(recipient_list),
+        # Письмо, отправляемое сразу, создаётся уже захваченным.
+        send_after=get_claim_deadline() if eager else timezone.now(),
+    )
+    if eager:
+        send_emails([email])
+    return email
+
+
+def get_retry_delay(attempts):
+    return timedelta(
+        seconds=get_setting('RETRY_DELAY', DEFAULT_RETRY_DELAY)
+        * 2 ** (attempts - 1)
+    )
+
+
+def record_failure(email, error, max_attempts):
+    email.last_error = f'{type(error).__name__}: {error}'
+    if email.attempts >= max_attempts:
+        email.status = OutgoingEmail.FAILED
+    else:
+        email.send_after = timezone.now() + get_retry_delay(email.attempts)
+
+
+def save_result(email):
+    email.save(update_fields=(
+        'status', 'attempts', 'send_after', 'sent', 'last_error'
+    ))
+
+
+def send_emails(emails):
+    """Отправляет письма через одно соединение и записывает результат
+    каждого. Если соединение не открылось, неудачной попыткой считается
+    отправка всей пачки. Возвращает число отправленных писем."""
+    max_attempts = get_setting('MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            email.attempts += 1
+            record_failure(email, error, max_attempts)
+            save_result(email)
+        return 0
+    sent = 0
+    try:
+        for email in emails:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email,
+                to=email.recipients,
+                connection=connection,
+            )
+            email.attempts += 1
+            try:
+                message.send()
+            except Exception as error:
+                record_failure(email, error, max_attempts)
+            else:
+                email.status = OutgoingEmail.SENT
+                email.sent = timezone.now()
+                email.last_error = ''
+                sent += 1
+            save_result(email)
+    finally:
+        connection.close()
+    return sent
+
+
+def claim_pending(batch_size):
+    """Захватывает до batch_size писем, срок отправки которых наступил.
+    Письмо достаётся тому, чей UPDATE с прежним send_after изменил строку;
+    на PostgreSQL строки, заблокированные другим отправителем, к тому же
+    пропускаются (skip_locked)."""
+    deadline = get_claim_deadline()
+    claimed = []
+    with transaction.atomic():
+        candidates = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                status=OutgoingEmail.PENDING,
+                send_after__lte=timezone.now(),
+            )
+            .order_by('send_after', 'id')[:batch_size]
+        )
+        for email in candidates:
+            if OutgoingEmail.objects.filter(
+                pk=email.pk,
+                status=OutgoingEmail.PENDING,
+                send_after=email.send_after,
+            ).update(send_after=deadline):
+                email.send_after = deadline
+                claimed.append(email)
+    return claimed
+
+
+def send_pending(batch_size=None):
+    """Отправляет одну пачку писем, срок отправки которых наступил.
+    Возвращает (отправлено, выбрано)."""
+    batch_size = batch_size or get_setting('BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    emails = claim_pending(batch_size)
+    if not emails:
+        return 0, 0
+    return send_emails(emails), len(emails)
@@ -1,8 +1,16 @@
 import csv
+import gzip
 import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
 
-from django.core.management.base import BaseCommand
 from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, models, transaction
+from django.utils import timezone
 
 from reviews.models import (
     Title,
@@ -13,42 +21,242 @@ from reviews.models import (
     Comment,
     GenreTitle,
 )
+from reviews.signals import bulk_changed
+
+
+FILE_MODEL_MAPPING = {
+    'users.csv': User,
+    'category.csv': Category,
+    'genre.csv': Genre,
+    'titles.csv': Title,
+    'review.csv': Review,
+    'comments.csv': Comment,
+    'genre_title.csv': GenreTitle,
+}
+# Заголовки файлов static/data; generate_data и dump_data пишут те же
+# колонки.
+FILE_COLUMNS = {
+    'users.csv': (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    ),
+    'category.csv': ('id', 'name', 'slug'),
+    'genre.csv': ('id', 'name', 'slug'),
+    'titles.csv': ('id', 'name', 'year', 'category'),
+    'review.csv': ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    'comments.csv': ('id', 'review_id', 'text', 'author', 'pub_date'),
+    'genre_title.csv': ('id', 'title_id', 'genre_id'),
+}
+DEFAULT_BATCH_SIZE = 2000
+DEFAULT_WORKERS = 4
+
+
+def get_dependencies(mapping):
+    """Для каждого файла возвращает файлы, на модели которых ссылаются
+    внешние ключи его модели."""
+    file_by_model = {model: file for file, model in mapping.items()}
+    dependencies = {}
+    for file, model in mapping.items():
+        dependencies[file] = {
+            file_by_model[field.related_model]
+            for field in model._meta.concrete_fields
+            if field.is_relation
+            and field.related_model is not model
+            and field.related_model in file_by_model
+        }
+    return dependencies
+
+
+def get_columns(model, fieldnames):
+    """Сопоставляет колонки csv с атрибутами модели.
+
+    Внешние ключи (`category`, `author`, `title_id`) пишутся сразу в
+    `<поле>_id`, без запросов к связанным таблицам."""
+    fields = {}
+    for field in model._meta.concrete_fields:
+        fields[field.name] = field
+        fields[field.attname] = field
+    columns = []
+    for column in fieldnames:
+        field = fields.get(column)
+        if field is None:
+            raise CommandError(
+                f'У модели {model.__name__} нет поля для колонки {column}.'
+            )
+        columns.append((column, field.attname, field.null))
+    return columns
+
+
+def open_csv(path):
+    """Открывает csv, а если его нет - сжатый `<файл>.gz`."""
+    if not os.path.exists(path) and os.path.exists(path + '.gz'):
+        return gzip.open(path + '.gz', 'rt', encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def read_rows(model, reader):
+    """Строки csv как кортежи значений полей модели; пустые значения
+    полей с null=True становятся NULL."""
+    fields = {field.attname: field for field in model._meta.concrete_fields}
+    columns = [
+        (column, fields[attname].to_python, null)
+        for column, attname, null in get_columns(model, reader.fieldnames)
+    ]
+    for row in reader:
+        yield tuple(
+            None if null and row[column] == '' else to_python(row[column])
+            for column, to_python, null in columns
+        )
+
+
+def get_default(field):
+    # bulk_create подставил бы текущее время в поля auto_now(_add).
+    if getattr(field, 'auto_now', False) or getattr(
+        field, 'auto_now_add', False
+    ):
+        return timezone.now()
+    return field.get_default()
+
+
+def insert_rows(model, header, rows, batch_size):
+    """Вставляет строки через executemany, минуя создание объектов
+    модели и pre_save: даты из строк сохраняются как есть. Поля, которых
+    нет в заголовке, получают значения по умолчанию, даты приводятся к
+    формату базы."""
+    attnames = [attname for _, attname, _ in get_columns(model, header)]
+    fields = {field.attname: field for field in model._meta.concrete_fields}
+    columns = [fields.pop(attname) for attname in attnames]
+    extra = list(fields.values())
+    defaults = tuple(
+        field.get_db_prep_save(get_default(field), connection)
+        for field in extra
+    )
+    names = [field.column for field in columns + extra]
+    dates = [
+        index for index, field in enumerate(columns)
+        if isinstance(field, models.DateTimeField)
+    ]
+
+    def prepare(row):
+        if dates:
+            row = list(row)
+            for index in dates:
+                row[index] = columns[index].get_db_prep_save(
+                    row[index], connection
+                )
+            row = tuple(row)
+        return row + defaults
+
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        connection.ops.quote_name(model._meta.db_table),
+        ', '.join(connection.ops.quote_name(name) for name in names),
+        ', '.join(['%s'] * len(names)),
+    )
+    inserted = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        batch = list(islice(rows, batch_size))
+        while batch:
+            cursor.executemany(sql, [prepare(row) for row in batch])
+            inserted += len(batch)
+            batch = list(islice(rows, batch_size))
+    return inserted
+
+
+def reset_sequences(models):
+    # Строки загружаются с явными id, счётчики PostgreSQL нужно сдвинуть.
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
 
 
 class Command(BaseCommand):
+    help = 'Загружает данные из csv файлов в базу.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.BASE_DIR, 'static/data'),
+            help='Каталог с csv файлами (или сжатыми .csv.gz).',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одном INSERT.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help=(
+                'Сколько файлов загружать одновременно. Для SQLite по '
+                f'умолчанию 1 (один писатель), иначе {DEFAULT_WORKERS}.'
+            ),
+        )
+
     def handle(self, *args, **options):
         """Добавляет данные из csv файлов в модели.
         Для добавления записей в бд введите в терминале команду
         rm db.sqlite3 && python manage.py migrate && python manage.py add_data
         """
-        csv_files_path = os.path.join(settings.BASE_DIR, 'static/data')
-        dir_path = os.path.abspath(csv_files_path)
-
-        file_model_mapping = {
-            'users.csv': User,
-            'category.csv': Category,
-            'genre.csv': Genre,
-            'titles.csv': Title,
-            'review.csv': Review,
-            'comments.csv': Comment,
-            'genre_title.csv': GenreTitle,
-        }
-
-        for file, model in file_model_mapping.items():
-            path = os.path.join(dir_path, file)
-
-            obj_list = []
-            with open(path, encoding='utf-8') as csv_file:
-                for obj_dict in csv.DictReader(csv_file):
-                    if isinstance(model(), Title):
-                        category_id = int(obj_dict['category'])
-                        category = Category.objects.get(id=category_id)
-                        obj_dict['category'] = category
-                    if isinstance(model(), (Review, Comment)):
-                        author_id = int(obj_dict['author'])
-                        author = User.objects.get(id=author_id)
-                        obj_dict['author'] = author
-                    obj_list.append(model(**obj_dict))
-                model.objects.bulk_create(obj_list)
+        dir_path = os.path.abspath(options['path'])
+        workers = options['workers']
+        if workers is None:
+            workers = 1 if connection.vendor == 'sqlite' else DEFAULT_WORKERS
+        self.import_files(dir_path, options['batch_size'], workers)
+        reset_sequences(FILE_MODEL_MAPPING.values())
+        for model in FILE_MODEL_MAPPING.values():
+            bulk_changed.send(sender=model, objects=None)
 
+        # Строки вставляются мимо ORM и сигналов, поэтому рейтинг и статистика
+        # жанров и категорий пересчитываются после загрузки отзывов.
+        call_command('rebuild_ratings', stdout=self.stdout)
+        call_command('rebuild_statistics', stdout=self.stdout)
         self.stdout.write(self.style.SUCCESS('Данные успешно добавлены.'))
+
+    def import_files(self, dir_path, batch_size, workers):
+        """Загружает файл, как только загружены все файлы, от которых он
+        зависит; независимые файлы загружаются параллельно."""
+        dependencies = get_dependencies(FILE_MODEL_MAPPING)
+        done = set()
+        running = {}
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            while len(done) < len(dependencies):
+                for file, required in dependencies.items():
+                    if (
+                        file in done
+                        or file in running.values()
+                        or not required <= done
+                    ):
+                        continue
+                    future = executor.submit(
+                        self.import_file_in_thread,
+                        os.path.join(dir_path, file),
+                        FILE_MODEL_MAPPING[file],
+                        batch_size,
+                    )
+                    running[future] = file
+                if not running:
+                    raise CommandError('Циклическая зависимость файлов.')
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    future.result()
+                    done.add(running.pop(future))
+
+    def import_file_in_thread(self, path, model, batch_size):
+        try:
+            self.import_file(path, model, batch_size)
+        finally:
+            connections.close_all()
+
+    def import_file(self, path, model, batch_size):
+        started = time.monotonic()
+        with open_csv(path) as csv_file:
+            reader = csv.DictReader(csv_file)
+            rows = insert_rows(
+                model, reader.fieldnames, read_rows(model, reader), batch_size
+            )
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'{os.path.basename(path)}: {rows} строк за {elapsed:.2f} с '
+            f'({rows / elapsed:.0f} строк/с)'
+        )
@@ -0,0 +1,143 @@
+import csv
+import gzip
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from reviews.management.commands.add_data import (
+    DEFAULT_WORKERS,
+    FILE_COLUMNS,
+    FILE_MODEL_MAPPING,
+    get_columns,
+)
+
+DEFAULT_CHUNK_SIZE = 5000
+GZIP_LEVEL = 6
+
+
+def get_header(file, model):
+    """Колонки файла add_data, за ними остальные поля модели: снимок
+    сохраняет и то, чего нет в static/data (пароли, описания)."""
+    header = list(FILE_COLUMNS[file])
+    written = {attname for _, attname, _ in get_columns(model, header)}
+    header += [
+        field.name for field in model._meta.concrete_fields
+        if field.attname not in written
+    ]
+    return header
+
+
+def format_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+    return value
+
+
+def iter_chunks(model, attnames, chunk_size):
+    """Строки таблицы пачками по chunk_size в порядке ключа: каждая пачка -
+    отдельный запрос с условием `id > последний прочитанный`."""
+    pk = model._meta.pk.attname
+    key = attnames.index(pk)
+    queryset = model.objects.order_by(pk).values_list(*attnames)
+    chunk = list(queryset[:chunk_size])
+    while chunk:
+        yield [[format_value(value) for value in row] for row in chunk]
+        if len(chunk) < chunk_size:
+            return
+        last = chunk[-1][key]
+        chunk = list(queryset.filter(pk__gt=last)[:chunk_size])
+
+
+def open_output(path, compress):
+    if compress:
+        return gzip.open(
+            path, 'wt', encoding='utf-8', newline='',
+            compresslevel=GZIP_LEVEL,
+        )
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает таблицы в csv в формате add_data (с --gzip - в '
+        '.csv.gz).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', required=True, help='Каталог для csv файлов.'
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать файлы gzip (<файл>.csv.gz).',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Количество строк, читаемых одним запросом.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DEFAULT_WORKERS,
+            help='Сколько файлов писать одновременно.',
+        )
+
+    def handle(self, *args, **options):
+        """Таблицы читаются независимо друг от друга, поэтому файлы пишутся
+        параллельно; память не зависит от размера таблиц."""
+        dir_path = os.path.abspath(options['path'])
+        os.makedirs(dir_path, exist_ok=True)
+        with ThreadPoolExecutor(
+            max_workers=max(options['workers'], 1)
+        ) as executor:
+            futures = [
+                executor.submit(
+                    self.dump_file_in_thread,
+                    dir_path,
+                    file,
+                    model,
+                    options['gzip'],
+                    options['chunk_size'],
+                )
+                for file, model in FILE_MODEL_MAPPING.items()
+            ]
+            for future in futures:
+                future.result()
+        self.stdout.write(
+            self.style.SUCCESS(f'Данные выгружены в {dir_path}.')
+        )
+
+    def dump_file_in_thread(self, *args):
+        try:
+            self.dump_file(*args)
+        finally:
+            connections.close_all()
+
+    def dump_file(self, dir_path, file, model, compress, chunk_size):
+        started = time.monotonic()
+        name = file + '.gz' if compress else file
+        header = get_header(file, model)
+        attnames = [attname for _, attname, _ in get_columns(model, header)]
+        rows = 0
+        with open_output(os.path.join(dir_path, name), compress) as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(header)
+            for chunk in iter_chunks(model, attnames, chunk_size):
+                writer.writerows(chunk)
+                rows += len(chunk)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'{name}: {rows} строк за {elapsed:.2f} с '
+            f'({rows / elapsed:.0f} строк/с)'
+        )
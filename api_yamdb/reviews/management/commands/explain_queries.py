@@ -0,0 +1,79 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+
+from api.v1.urls import router
+from reviews.models import Comment, Review
+
+
+class Command(BaseCommand):
+    help = (
+        'Печатает планы выполнения (EXPLAIN) запросов всех списочных '
+        'эндпоинтов API.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--query',
+            default='',
+            help='Параметры запроса, например "genre=rock&year=1990".',
+        )
+        parser.add_argument(
+            '--format',
+            dest='explain_format',
+            default=None,
+            help='Формат EXPLAIN, если его поддерживает база (json, text).',
+        )
+
+    def handle(self, *args, **options):
+        kwargs = self.get_parent_kwargs()
+        for prefix, viewset, basename in router.registry:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'/{prefix}/'))
+            missing = [
+                name for name in ('title_id', 'review_id')
+                if f'<{name}>' in prefix and name not in kwargs
+            ]
+            if missing:
+                missing = ', '.join(missing)
+                self.stdout.write(
+                    f'  пропущено: в базе нет объектов для {missing}'
+                )
+                continue
+            queryset = self.get_list_queryset(
+                viewset, prefix, kwargs, options['query']
+            )
+            self.stdout.write(f'  {queryset.query}')
+            plan = queryset.explain(format=options['explain_format'])
+            for line in plan.splitlines():
+                self.stdout.write(f'  {line}')
+
+    def get_parent_kwargs(self):
+        """Берёт родительские объекты из базы: отзыв с комментариями, если
+        такой есть, чтобы план строился на реальных данных."""
+        review = (
+            Review.objects.filter(
+                pk__in=Comment.objects.values('review_id')[:1]
+            ).first()
+            or Review.objects.first()
+        )
+        if review is None:
+            return {}
+        return {'title_id': review.title_id, 'review_id': review.pk}
+
+    def get_list_queryset(self, viewset, prefix, kwargs, query):
+        view_kwargs = {
+            name: value for name, value in kwargs.items()
+            if f'<{name}>' in prefix
+        }
+        request = APIRequestFactory().get(f'/{prefix}/?{query}')
+        request.user = AnonymousUser()
+        view = viewset(
+            action_map={'get': 'list'},
+            kwargs=view_kwargs,
+            format_kwarg=None,
+        )
+        view.request = view.initialize_request(request, **view_kwargs)
+        view.args = ()
+        queryset = view.filter_queryset(view.get_queryset())
+        page_size = view.paginator.get_page_size(view.request)
+        return queryset[:page_size] if page_size else queryset
@@ -0,0 +1,293 @@
+import csv
+import math
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from reviews.management.commands.add_data import (
+    FILE_COLUMNS,
+    FILE_MODEL_MAPPING,
+    insert_rows,
+    reset_sequences,
+)
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.signals import bulk_changed
+
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_SKEW = 1.1
+CATEGORY_NAMES = ('Книги', 'Фильмы', 'Музыка', 'Игры', 'Сериалы')
+GENRE_NAMES = (
+    'Драма', 'Комедия', 'Рок', 'Джаз', 'Фэнтези', 'Ужасы', 'Триллер',
+    'Классика', 'Детектив', 'Мелодрама', 'Документальный', 'Вестерн',
+)
+WORDS = (
+    'отличный сюжет скучный финал музыка актёры режиссёр книга автор '
+    'персонажи атмосфера история мир герой злодей диалоги темп концовка '
+    'начало середина эффекты звук стиль жанр классика шедевр провал '
+    'перевод обложка саундтрек сцена монтаж голос ритм образ смысл'
+).split()
+SCORE_WEIGHTS = (2, 1, 2, 3, 5, 8, 13, 17, 15, 10)
+START_DATE = datetime(2015, 1, 1, tzinfo=timezone.utc)
+DATE_RANGE = 8 * 365 * 24 * 60 * 60
+
+
+class Zipf:
+    """Номера 1..n с вероятностью, убывающей как 1 / k ** s.
+
+    Номер берётся по обратной функции распределения непрерывного
+    аналога, поэтому выборка - O(1) по времени и памяти."""
+
+    def __init__(self, n, s, rng):
+        self.n = n
+        self.s = s
+        self.rng = rng
+        self.span = (n + 1) ** (1 - s) - 1 if s != 1 else None
+
+    def share(self, k):
+        """Доля номеров 1..k в распределении."""
+        if self.s == 1:
+            return math.log(k + 1) / math.log(self.n + 1)
+        return ((k + 1) ** (1 - self.s) - 1) / self.span
+
+    def sample(self):
+        u = self.rng.random()
+        if self.s == 1:
+            value = (self.n + 1) ** u
+        else:
+            value = (1 + u * self.span) ** (1 / (1 - self.s))
+        return min(self.n, int(value))
+
+
+class Permutation:
+    """Перестановка 1..n вида (a * (k - 1) + b) mod n + 1. Переводит
+    ранги распределения в id, чтобы популярные объекты не шли подряд."""
+
+    def __init__(self, n, rng):
+        self.n = n
+        self.a = rng.randrange(1, n) if n > 1 else 1
+        while math.gcd(self.a, n) != 1:
+            self.a += 1
+        self.b = rng.randrange(n)
+
+    def __call__(self, k):
+        return (self.a * (k - 1) + self.b) % self.n + 1
+
+
+class Generator:
+    """Строки всех таблиц в формате csv команды add_data. Строки
+    выдаются потоком, и память не зависит от их числа."""
+
+    def __init__(self, counts, skew, seed):
+        self.counts = counts
+        self.skew = skew
+        self.rng = random.Random(seed)
+
+    def text(self, words):
+        return ' '.join(self.rng.choices(WORDS, k=words))
+
+    def pub_date(self):
+        return START_DATE + timedelta(seconds=self.rng.randrange(DATE_RANGE))
+
+    def names(self, base, count):
+        for pk in range(1, count + 1):
+            name = base[(pk - 1) % len(base)]
+            if pk > len(base):
+                name = f'{name} {(pk - 1) // len(base) + 1}'
+            yield pk, name, f'slug-{pk}'
+
+    def users(self):
+        for pk in range(1, self.counts['users'] + 1):
+            role = User.MODERATOR if pk % 100 == 0 else User.USER
+            yield pk, f'user{pk}', f'user{pk}@yamdb.fake', role, '', '', ''
+
+    def categories(self):
+        return self.names(CATEGORY_NAMES, self.counts['categories'])
+
+    def genres(self):
+        return self.names(GENRE_NAMES, self.counts['genres'])
+
+    def titles(self):
+        categories = Zipf(self.counts['categories'], self.skew, self.rng)
+        for pk in range(1, self.counts['titles'] + 1):
+            yield (
+                pk,
+                f'{self.text(2).capitalize()} {pk}',
+                self.rng.randint(1950, 2023),
+                categories.sample(),
+            )
+
+    def genre_titles(self):
+        genres = Zipf(self.counts['genres'], self.skew, self.rng)
+        pk = 0
+        for title_id in range(1, self.counts['titles'] + 1):
+            chosen = {genres.sample() for _ in range(self.rng.randint(1, 3))}
+            for genre_id in sorted(chosen):
+                pk += 1
+                yield pk, title_id, genre_id
+
+    def reviews(self):
+        """Число отзывов произведения убывает по закону Ципфа с его
+        рангом. Авторы отзывов одного произведения берутся из перестановки
+        пользователей подряд, поэтому пара (автор, произведение)
+        уникальна."""
+        titles, users = self.counts['titles'], self.counts['users']
+        total = self.counts['reviews']
+        popularity = Zipf(titles, self.skew, self.rng)
+        title_ids = Permutation(titles, self.rng)
+        authors = Permutation(users, self.rng)
+        scores = range(1, 11)
+        pk = 0
+        for rank in range(1, titles + 1):
+            target = round(total * popularity.share(rank))
+            count = min(users, target - pk)
+            title_id = title_ids(rank)
+            offset = self.rng.randrange(users)
+            for index in range(count):
+                pk += 1
+                yield (
+                    pk,
+                    title_id,
+                    self.text(self.rng.randint(5, 30)),
+                    authors((offset + index) % users + 1),
+                    self.rng.choices(scores, SCORE_WEIGHTS)[0],
+                    self.pub_date(),
+                )
+        if pk != total:
+            raise CommandError(
+                f'Удалось распределить {pk} отзывов из {total}: '
+                'увеличьте число пользователей или произведений.'
+            )
+
+    def comments(self):
+        reviews = Zipf(self.counts['reviews'], self.skew, self.rng)
+        review_ids = Permutation(self.counts['reviews'], self.rng)
+        authors = Zipf(self.counts['users'], self.skew, self.rng)
+        user_ids = Permutation(self.counts['users'], self.rng)
+        for pk in range(1, self.counts['comments'] + 1):
+            yield (
+                pk,
+                review_ids(reviews.sample()),
+                self.text(self.rng.randint(3, 20)),
+                user_ids(authors.sample()),
+                self.pub_date(),
+            )
+
+    def files(self):
+        """(файл, заголовок, строки) в порядке зависимостей."""
+        return (
+            (name, FILE_COLUMNS[name], rows)
+            for name, rows in (
+                ('users.csv', self.users()),
+                ('category.csv', self.categories()),
+                ('genre.csv', self.genres()),
+                ('titles.csv', self.titles()),
+                ('genre_title.csv', self.genre_titles()),
+                ('review.csv', self.reviews()),
+                ('comments.csv', self.comments()),
+            )
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетические данные с распределением Ципфа: пишет '
+        'в базу или в csv для add_data.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in (
+            ('users', 1000),
+            ('categories', 5),
+            ('genres', 12),
+            ('titles', 1000),
+            ('reviews', 20000),
+            ('comments', 20000),
+        ):
+            parser.add_argument(
+                f'--{name}', type=int, default=default,
+                help=f'Число строк (по умолчанию {default}).',
+            )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=DEFAULT_SKEW,
+            help='Показатель s распределения Ципфа.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--csv',
+            metavar='DIR',
+            help='Записать csv в каталог вместо загрузки в базу.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        counts = {
+            name: options[name]
+            for name in (
+                'users', 'categories', 'genres', 'titles', 'reviews',
+                'comments',
+            )
+        }
+        if min(counts.values()) < 1:
+            raise CommandError('Число строк каждой таблицы должно быть > 0.')
+        if counts['users'] * counts['titles'] < counts['reviews']:
+            raise CommandError(
+                'Отзывов больше, чем пар (пользователь, произведение).'
+            )
+        generator = Generator(counts, options['skew'], options['seed'])
+        if options['csv']:
+            self.write_csv(generator, options['csv'])
+        else:
+            self.write_db(generator, options['batch_size'])
+
+    def report(self, name, rows, started):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'{name}: {rows} строк за {elapsed:.2f} с '
+            f'({rows / elapsed:.0f} строк/с)'
+        )
+
+    def write_csv(self, generator, path):
+        os.makedirs(path, exist_ok=True)
+        for name, header, rows in generator.files():
+            started = time.monotonic()
+            with open(
+                os.path.join(path, name), 'w', encoding='utf-8', newline=''
+            ) as csv_file:
+                writer = csv.writer(csv_file)
+                writer.writerow(header)
+                count = 0
+                for batch in iter(lambda: list(islice(rows, 10000)), []):
+                    writer.writerows(batch)
+                    count += len(batch)
+            self.report(name, count, started)
+        self.stdout.write(self.style.SUCCESS(f'csv записаны в {path}.'))
+
+    def write_db(self, generator, batch_size):
+        if any(
+            model.objects.exists()
+            for model in (User, Category, Genre, Title, Review, Comment)
+        ):
+            raise CommandError(
+                'В базе уже есть данные: генерация идёт с явными id.'
+            )
+        for name, header, rows in generator.files():
+            model = FILE_MODEL_MAPPING[name]
+            started = time.monotonic()
+            self.report(
+                name, insert_rows(model, header, rows, batch_size), started
+            )
+        reset_sequences(FILE_MODEL_MAPPING.values())
+        for model in FILE_MODEL_MAPPING.values():
+            bulk_changed.send(sender=model, objects=None)
+        call_command('rebuild_ratings', stdout=self.stdout)
+        call_command('rebuild_statistics', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS('Данные сгенерированы.'))
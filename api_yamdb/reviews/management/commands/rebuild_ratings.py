@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинг всех произведений по отзывам.'
+
+    def handle(self, *args, **options):
+        updated = Title.objects.rebuild_rating()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитан рейтинг {updated} произведений.')
+        )
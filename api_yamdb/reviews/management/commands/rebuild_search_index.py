@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from reviews import search
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс с нуля.'
+
+    def handle(self, *args, **options):
+        for kind in search.KINDS:
+            indexed = search.rebuild_kind(kind)
+            self.stdout.write(f'{kind}: {indexed} документов')
+        self.stdout.write(self.style.SUCCESS('Индекс перестроен.'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import CategoryStatistics, GenreStatistics
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает статистику жанров и категорий с нуля.'
+
+    def handle(self, *args, **options):
+        for model in (GenreStatistics, CategoryStatistics):
+            with transaction.atomic():
+                model.create_missing()
+                updated = model.objects.rebuild()
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: {updated} строк'
+            )
+        self.stdout.write(self.style.SUCCESS('Статистика пересчитана.'))
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews import mail
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди исходящей почты. Без --once работает '
+        'постоянно; экземпляров команды может быть несколько.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Отправить накопившиеся письма и завершиться.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Число писем, отправляемых через одно соединение.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, selected = mail.send_pending(options['batch_size'])
+            if selected:
+                self.stdout.write(
+                    f'Отправлено {sent} из {selected} писем.'
+                )
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
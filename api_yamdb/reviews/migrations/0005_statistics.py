@@ -0,0 +1,42 @@
+# Generated by Django 3.2 on 2026-10-18 20:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_remove_user_confirmation_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryStatistics',
+            fields=[
+                ('title_count', models.PositiveIntegerField(default=0, verbose_name='Количество произведений')),
+                ('review_count', models.PositiveBigIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('rating_sum', models.PositiveBigIntegerField(default=0, verbose_name='Сумма оценок')),
+                ('rating', models.FloatField(blank=True, null=True, verbose_name='Средняя оценка')),
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to='reviews.category', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Статистика категории',
+                'verbose_name_plural': 'Статистика категорий',
+            },
+        ),
+        migrations.CreateModel(
+            name='GenreStatistics',
+            fields=[
+                ('title_count', models.PositiveIntegerField(default=0, verbose_name='Количество произведений')),
+                ('review_count', models.PositiveBigIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('rating_sum', models.PositiveBigIntegerField(default=0, verbose_name='Сумма оценок')),
+                ('rating', models.FloatField(blank=True, null=True, verbose_name='Средняя оценка')),
+                ('genre', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to='reviews.genre', verbose_name='Жанр')),
+            ],
+            options={
+                'verbose_name': 'Статистика жанра',
+                'verbose_name_plural': 'Статистика жанров',
+            },
+        ),
+    ]
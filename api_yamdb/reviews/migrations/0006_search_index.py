@@ -0,0 +1,64 @@
+from django.db import migrations, router
+
+
+class RunVendorSQL(migrations.RunSQL):
+    """RunSQL с отдельным SQL для каждой СУБД; на остальных СУБД ничего
+    не делает."""
+
+    def __init__(self, vendors):
+        self.vendors = vendors
+        super().__init__(migrations.RunSQL.noop, migrations.RunSQL.noop)
+
+    def deconstruct(self):
+        return self.__class__.__name__, [self.vendors], {}
+
+    def get_sql(self, schema_editor, reverse):
+        sql = self.vendors.get(schema_editor.connection.vendor)
+        if sql is None:
+            return []
+        return sql[reverse]
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        if router.allow_migrate(
+            schema_editor.connection.alias, app_label, **self.hints
+        ):
+            self._run_sql(schema_editor, self.get_sql(schema_editor, False))
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        if router.allow_migrate(
+            schema_editor.connection.alias, app_label, **self.hints
+        ):
+            self._run_sql(schema_editor, self.get_sql(schema_editor, True))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_statistics'),
+    ]
+
+    operations = [
+        RunVendorSQL({
+            'sqlite': (
+                [
+                    'CREATE VIRTUAL TABLE IF NOT EXISTS reviews_search_index '
+                    'USING fts5(body, title_id UNINDEXED, '
+                    "review_id UNINDEXED, tokenize='unicode61')",
+                ],
+                ['DROP TABLE IF EXISTS reviews_search_index'],
+            ),
+            'postgresql': (
+                [
+                    'CREATE TABLE IF NOT EXISTS reviews_search_index ('
+                    'id bigint PRIMARY KEY, title_id bigint, '
+                    'review_id bigint, body text NOT NULL, '
+                    'document tsvector NOT NULL)',
+                    'CREATE INDEX IF NOT EXISTS reviews_search_index_document '
+                    'ON reviews_search_index USING gin (document)',
+                ],
+                ['DROP TABLE IF EXISTS reviews_search_index'],
+            ),
+        }),
+    ]
@@ -2,7 +2,22 @@ from django.core.validators import MaxValueValidator, MinValueValidator
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.core.validators import RegexValidator
-from django.db import models
+from django.db import NotSupportedError, connections, models, transaction
+from django.db.models import (
+    Avg,
+    BigIntegerField,
+    Case,
+    Count,
+    F,
+    FloatField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -33,9 +48,6 @@ class User(AbstractUser):
         max_length=30, choices=USER_ROLES, default=USER, verbose_name='Роль'
     )
     bio = models.TextField(blank=True, verbose_name='Биография')
-    confirmation_code = models.CharField(
-        verbose_name='Код подтверждения', max_length=36, blank=True, null=True
-    )
 
     class Meta:
         verbose_name = 'Пользователь'
@@ -45,6 +57,20 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Права на момент загрузки: по ним видно, что роль изменилась и
+        # выданные токены с прежней ролью надо перепроверять по базе.
+        instance._loaded_access = instance.get_access()
+        return instance
+
+    def get_access(self):
+        return tuple(
+            self.__dict__.get(name)
+            for name in ('role', 'is_active', 'is_superuser')
+        )
+
     @property
     def is_admin(self):
         return self.role == self.ADMIN
@@ -82,6 +108,64 @@ class Category(models.Model):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+    def update_rating(self, score_delta, count_delta):
+        """Сдвигает сумму и количество оценок и пересчитывает рейтинг
+        одним UPDATE, без агрегации по отзывам."""
+        rating_sum = F('rating_sum') + score_delta
+        rating_count = F('rating_count') + count_delta
+        return self.update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=Cast(rating_sum, FloatField())
+            / NullIf(Cast(rating_count, FloatField()), 0.0),
+        )
+
+    def rebuild_rating(self):
+        """Пересчитывает рейтинг с нуля по таблице отзывов."""
+        reviews = (
+            Review.objects.filter(title=OuterRef('pk'))
+            .order_by()
+            .values('title')
+        )
+        return self.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0,
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('id')).values('total')),
+                0,
+            ),
+            rating=Subquery(reviews.annotate(avg=Avg('score')).values('avg')),
+        )
+
+    def bulk_create_with_ids(self, titles, batch_size=None):
+        """bulk_create, после которого у всех произведений заполнен id.
+
+        SQLite в Django 3.2 не возвращает id из массовой вставки. Вставка
+        и чтение id идут в одной транзакции: база заблокирована на запись,
+        поэтому вставленные строки - последние по id, в порядке вставки."""
+        connection = connections[self.db]
+        if connection.features.can_return_rows_from_bulk_insert:
+            return self.bulk_create(titles, batch_size=batch_size)
+        if connection.vendor != 'sqlite':
+            raise NotSupportedError(
+                'Массовое создание произведений поддерживается только для '
+                'PostgreSQL и SQLite.'
+            )
+        with transaction.atomic(using=self.db):
+            self.bulk_create(titles, batch_size=batch_size)
+            ids = list(
+                self.order_by('-pk').values_list('pk', flat=True)[
+                    :len(titles)
+                ]
+            )
+        for title, pk in zip(titles, reversed(ids)):
+            title.pk = pk
+        return titles
+
+
 class Title(models.Model):
     name = models.CharField(
         max_length=256, verbose_name='Название произведения'
@@ -105,14 +189,43 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Категория произведения',
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Сумма оценок'
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Количество оценок'
+    )
+    rating = models.FloatField(
+        blank=True,
+        null=True,
+        editable=False,
+        db_index=True,
+        verbose_name='Рейтинг произведения',
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(fields=['year'], name='title_year_idx'),
+            models.Index(
+                fields=['category', 'id'], name='title_category_id_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Категория на момент загрузки: при её смене статистика переносится
+        # из старой категории в новую.
+        instance._loaded_category_id = instance.__dict__.get('category_id')
+        return instance
+
 
 class GenreTitle(models.Model):
     title = models.ForeignKey(
@@ -125,6 +238,11 @@ class GenreTitle(models.Model):
     class Meta:
         verbose_name = 'Жанры произведения'
         verbose_name_plural = 'Жанры произведений'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['genre', 'title'], name='unique_genre_title'
+            )
+        ]
 
     def __str__(self):
         return f'{self.title} принадлежит жанру {self.genre}'
@@ -158,10 +276,25 @@ class Review(models.Model):
                 fields=['author', 'title'], name='unique_author_title'
             )
         ]
+        indexes = [
+            models.Index(fields=['title', 'id'], name='review_title_id_idx'),
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.title}, {self.score}, {self.author}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Оценка на момент загрузки нужна, чтобы пересчитать рейтинг
+        # произведения приращением, без повторного запроса.
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
+
 
 class Comment(models.Model):
     review = models.ForeignKey(
@@ -178,6 +311,269 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', 'id'], name='comment_review_id_idx'
+            ),
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.author}, {self.pub_date}: {self.text}'
+
+
+class StatisticsQuerySet(models.QuerySet):
+    def update_totals(self, titles=0, reviews=0, score=0):
+        """Сдвигает счётчики и пересчитывает средний рейтинг одним
+        UPDATE, как TitleQuerySet.update_rating."""
+        rating_sum = F('rating_sum') + score
+        review_count = F('review_count') + reviews
+        return self.update(
+            title_count=F('title_count') + titles,
+            review_count=review_count,
+            rating_sum=rating_sum,
+            rating=Cast(rating_sum, FloatField())
+            / NullIf(Cast(review_count, FloatField()), 0.0),
+        )
+
+    def update_many_totals(self, totals):
+        """Сдвигает счётчики нескольких групп одним UPDATE. totals -
+        словарь {pk: (titles, reviews, score)}."""
+        if not totals:
+            return 0
+
+        def delta(index):
+            return Case(
+                *(
+                    When(pk=pk, then=Value(values[index]))
+                    for pk, values in totals.items()
+                ),
+                default=Value(0),
+                output_field=BigIntegerField(),
+            )
+
+        return self.filter(pk__in=totals).update_totals(
+            delta(0), delta(1), delta(2)
+        )
+
+    def rebuild(self):
+        """Пересчитывает статистику с нуля по произведениям и отзывам."""
+        titles = self.model.get_titles()
+        reviews = self.model.get_reviews()
+        return self.update(
+            title_count=Coalesce(
+                Subquery(titles.annotate(total=Count('pk')).values('total')),
+                0,
+            ),
+            review_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('pk')).values('total')),
+                0,
+            ),
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0,
+            ),
+            rating=Subquery(reviews.annotate(avg=Avg('score')).values('avg')),
+        )
+
+
+class Statistics(models.Model):
+    """Статистика группы произведений, которая обновляется приращениями
+    при изменении произведений и отзывов (reviews.signals)."""
+
+    title_count = models.PositiveIntegerField(
+        default=0, verbose_name='Количество произведений'
+    )
+    review_count = models.PositiveBigIntegerField(
+        default=0, verbose_name='Количество отзывов'
+    )
+    rating_sum = models.PositiveBigIntegerField(
+        default=0, verbose_name='Сумма оценок'
+    )
+    rating = models.FloatField(
+        blank=True, null=True, verbose_name='Средняя оценка'
+    )
+
+    objects = StatisticsQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def create_missing(cls):
+        """Создаёт пустые строки статистики для групп, у которых их нет."""
+        field = cls._meta.pk
+        groups = field.related_model.objects.filter(statistics=None)
+        cls.objects.bulk_create(
+            (cls(**{field.attname: pk}) for pk in groups.values_list(
+                'pk', flat=True
+            )),
+            ignore_conflicts=True,
+        )
+
+
+class GenreStatistics(Statistics):
+    genre = models.OneToOneField(
+        Genre,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='statistics',
+        verbose_name='Жанр',
+    )
+
+    class Meta:
+        verbose_name = 'Статистика жанра'
+        verbose_name_plural = 'Статистика жанров'
+
+    def __str__(self):
+        return f'{self.genre}: {self.title_count}, {self.review_count}'
+
+    # Связи с произведениями и отзывы группы, сгруппированные по ней, для
+    # подзапросов StatisticsQuerySet.rebuild.
+    @staticmethod
+    def get_titles():
+        return GenreTitle.objects.filter(
+            genre=OuterRef('pk')
+        ).order_by().values('genre')
+
+    @staticmethod
+    def get_reviews():
+        return Review.objects.filter(
+            title__genre=OuterRef('pk')
+        ).order_by().values('title__genre')
+
+
+class CategoryStatistics(Statistics):
+    category = models.OneToOneField(
+        Category,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='statistics',
+        verbose_name='Категория',
+    )
+
+    class Meta:
+        verbose_name = 'Статистика категории'
+        verbose_name_plural = 'Статистика категорий'
+
+    def __str__(self):
+        return f'{self.category}: {self.title_count}, {self.review_count}'
+
+    @staticmethod
+    def get_titles():
+        return Title.objects.filter(
+            category=OuterRef('pk')
+        ).order_by().values('category')
+
+    @staticmethod
+    def get_reviews():
+        return Review.objects.filter(
+            title__category=OuterRef('pk')
+        ).order_by().values('title__category')
+
+
+class TableVersionQuerySet(models.QuerySet):
+    def bump(self, *labels):
+        """Сдвигает версии таблиц одним UPDATE."""
+        now = timezone.now()
+        updated = self.filter(label__in=labels).update(
+            version=F('version') + 1, modified=now
+        )
+        if updated < len(labels):
+            # Первое изменение таблицы: строка вставляется без savepoint.
+            # Сдвигаются только новые строки (версия 0); строка, которую
+            # другой процесс успел вставить и сдвинуть, уже изменилась.
+            self.bulk_create(
+                [
+                    self.model(label=label, version=0, modified=now)
+                    for label in labels
+                ],
+                ignore_conflicts=True,
+            )
+            self.filter(label__in=labels, version=0).update(
+                version=F('version') + 1, modified=now
+            )
+
+    def for_labels(self, labels):
+        """Возвращает версии и время изменения для списка моделей; для
+        ещё не изменявшихся моделей - (0, None)."""
+        found = {
+            label: (version, modified)
+            for label, version, modified in self.filter(
+                label__in=labels
+            ).values_list('label', 'version', 'modified')
+        }
+        return [found.get(label, (0, None)) for label in labels]
+
+
+class TableVersion(models.Model):
+    """Счётчик изменений таблицы, из которого строятся ETag и
+    Last-Modified ответов API."""
+
+    label = models.CharField(
+        max_length=100, unique=True, verbose_name='Модель'
+    )
+    version = models.PositiveBigIntegerField(default=0, verbose_name='Версия')
+    modified = models.DateTimeField(verbose_name='Время изменения')
+
+    objects = TableVersionQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Версия таблицы'
+        verbose_name_plural = 'Версии таблиц'
+
+    def __str__(self):
+        return f'{self.label}: {self.version}'
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди исходящей почты (reviews.mail)."""
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = [
+        (PENDING, 'Ожидает отправки'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    ]
+
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.CharField(
+        max_length=254, blank=True, null=True, verbose_name='Отправитель'
+    )
+    recipients = models.JSONField(default=list, verbose_name='Получатели')
+    status = models.CharField(
+        max_length=16, choices=STATUSES, default=PENDING,
+        verbose_name='Статус',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Попыток отправки'
+    )
+    send_after = models.DateTimeField(
+        default=timezone.now, verbose_name='Отправить не раньше'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True, verbose_name='Время постановки в очередь'
+    )
+    sent = models.DateTimeField(
+        blank=True, null=True, verbose_name='Время отправки'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(
+                fields=['status', 'send_after'],
+                name='outgoingemail_queue_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {", ".join(self.recipients)}'
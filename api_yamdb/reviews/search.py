@@ -0,0 +1,269 @@
+"""Полнотекстовый индекс произведений, отзывов и комментариев.
+
+На SQLite индекс - виртуальная таблица FTS5, на PostgreSQL - таблица с
+колонкой tsvector и GIN-индексом. Идентификатор документа в индексе
+кодирует тип и id объекта (`id * 4 + код типа`), поэтому документ
+обновляется и удаляется по первичному ключу. Таблица индекса создаётся
+миграцией 0006_search_index.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from reviews.models import Comment, Review, Title
+
+
+TABLE = 'reviews_search_index'
+KINDS = {'title': 1, 'review': 2, 'comment': 3}
+KIND_NAMES = {code: name for name, code in KINDS.items()}
+CHUNK_SIZE = 2000
+TOKEN_RE = re.compile(r'\w+')
+
+
+def document_id(kind, object_id):
+    return object_id * 4 + KINDS[kind]
+
+
+def title_document(title):
+    return (
+        document_id('title', title.pk),
+        title.pk,
+        None,
+        f'{title.name} {title.description}',
+    )
+
+
+def review_document(review):
+    return (
+        document_id('review', review.pk),
+        review.title_id,
+        review.pk,
+        review.text,
+    )
+
+
+def comment_document(comment, title_id):
+    return (
+        document_id('comment', comment.pk),
+        title_id,
+        comment.review_id,
+        comment.text,
+    )
+
+
+def comment_documents(comments):
+    """Документы комментариев. id произведений берутся из загруженных
+    вместе с комментариями отзывов, остальные читаются одним запросом."""
+    title_ids = {
+        comment.review_id: comment.review.title_id
+        for comment in comments
+        if Comment.review.is_cached(comment)
+    }
+    missing = {comment.review_id for comment in comments} - title_ids.keys()
+    if missing:
+        title_ids.update(
+            Review.objects.filter(pk__in=missing).values_list(
+                'pk', 'title_id'
+            )
+        )
+    return [
+        comment_document(comment, title_ids[comment.review_id])
+        for comment in comments
+    ]
+
+
+def build_documents(kind, objects):
+    if kind == 'comment':
+        return comment_documents(objects)
+    build = {'title': title_document, 'review': review_document}[kind]
+    return [build(instance) for instance in objects]
+
+
+class SQLiteBackend:
+    def save(self, cursor, documents):
+        cursor.executemany(
+            f'INSERT OR REPLACE INTO {TABLE} '
+            '(rowid, title_id, review_id, body) VALUES (%s, %s, %s, %s)',
+            documents,
+        )
+
+    def delete(self, cursor, ids):
+        cursor.executemany(
+            f'DELETE FROM {TABLE} WHERE rowid = %s', [(pk,) for pk in ids]
+        )
+
+    def delete_kind(self, cursor, kind):
+        cursor.execute(
+            f'DELETE FROM {TABLE} WHERE rowid %% 4 = %s', [KINDS[kind]]
+        )
+
+    def clear(self, cursor):
+        cursor.execute(f'DELETE FROM {TABLE}')
+
+    def search(self, cursor, terms, kinds, limit):
+        match = ' '.join(f'"{term}"' for term in terms)
+        codes = ', '.join(str(KINDS[kind]) for kind in kinds)
+        cursor.execute(
+            f'SELECT rowid, title_id, review_id, -bm25({TABLE}), '
+            f"snippet({TABLE}, 0, '<b>', '</b>', '...', 16) "
+            f'FROM {TABLE} WHERE {TABLE} MATCH %s '
+            f'AND rowid %% 4 IN ({codes}) ORDER BY bm25({TABLE}) LIMIT %s',
+            [match, limit],
+        )
+        return cursor.fetchall()
+
+
+class PostgreSQLBackend:
+    def __init__(self):
+        self.config = getattr(settings, 'SEARCH_CONFIG', 'russian')
+
+    def save(self, cursor, documents):
+        cursor.executemany(
+            f'INSERT INTO {TABLE} (id, title_id, review_id, body, document) '
+            'VALUES (%s, %s, %s, %s, to_tsvector(%s::regconfig, %s)) '
+            'ON CONFLICT (id) DO UPDATE SET body = EXCLUDED.body, '
+            'document = EXCLUDED.document',
+            [(*document, self.config, document[3]) for document in documents],
+        )
+
+    def delete(self, cursor, ids):
+        cursor.execute(
+            f'DELETE FROM {TABLE} WHERE id = ANY(%s)', [list(ids)]
+        )
+
+    def delete_kind(self, cursor, kind):
+        cursor.execute(
+            f'DELETE FROM {TABLE} WHERE id %% 4 = %s', [KINDS[kind]]
+        )
+
+    def clear(self, cursor):
+        cursor.execute(f'TRUNCATE {TABLE}')
+
+    def search(self, cursor, terms, kinds, limit):
+        cursor.execute(
+            'SELECT id, title_id, review_id, ts_rank(document, query), '
+            "ts_headline(%s::regconfig, body, query, 'MaxWords=16') "
+            f'FROM {TABLE}, plainto_tsquery(%s::regconfig, %s) query '
+            'WHERE document @@ query AND id %% 4 = ANY(%s) '
+            'ORDER BY 4 DESC LIMIT %s',
+            [
+                self.config,
+                self.config,
+                ' '.join(terms),
+                [KINDS[kind] for kind in kinds],
+                limit,
+            ],
+        )
+        return cursor.fetchall()
+
+
+BACKENDS = {'sqlite': SQLiteBackend, 'postgresql': PostgreSQLBackend}
+
+
+def get_backend():
+    backend = BACKENDS.get(connection.vendor)
+    return backend() if backend is not None else None
+
+
+def save_documents(documents):
+    backend = get_backend()
+    if backend is None or not documents:
+        return
+    with connection.cursor() as cursor:
+        backend.save(cursor, documents)
+
+
+def delete_documents(kind, object_ids):
+    backend = get_backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        backend.delete(
+            cursor, [document_id(kind, pk) for pk in object_ids]
+        )
+
+
+def clear_index():
+    backend = get_backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        backend.clear(cursor)
+
+
+def title_row_document(row):
+    pk, name, description = row
+    return document_id('title', pk), pk, None, f'{name} {description}'
+
+
+def review_row_document(row):
+    pk, title_id, text = row
+    return document_id('review', pk), title_id, pk, text
+
+
+def comment_row_document(row):
+    pk, title_id, review_id, text = row
+    return document_id('comment', pk), title_id, review_id, text
+
+
+SOURCES = {
+    'title': (Title, ('pk', 'name', 'description'), title_row_document),
+    'review': (Review, ('pk', 'title_id', 'text'), review_row_document),
+    'comment': (
+        Comment,
+        ('pk', 'review__title_id', 'review_id', 'text'),
+        comment_row_document,
+    ),
+}
+
+
+def iterate_documents(kind):
+    """Документы всех объектов типа, пачками по CHUNK_SIZE в порядке id."""
+    model, columns, build = SOURCES[kind]
+    queryset = model.objects.order_by('pk').values_list(*columns)
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk)[:CHUNK_SIZE])
+        if not rows:
+            return
+        yield [build(row) for row in rows]
+        last_pk = rows[-1][0]
+
+
+def rebuild_kind(kind):
+    backend = get_backend()
+    if backend is None:
+        return 0
+    indexed = 0
+    # Без транзакции SQLite фиксирует каждую строку executemany отдельно.
+    with transaction.atomic(), connection.cursor() as cursor:
+        backend.delete_kind(cursor, kind)
+        for documents in iterate_documents(kind):
+            backend.save(cursor, documents)
+            indexed += len(documents)
+    return indexed
+
+
+def search(query, kinds=None, limit=20):
+    """Возвращает найденные документы по убыванию релевантности."""
+    backend = get_backend()
+    terms = TOKEN_RE.findall(query)
+    if backend is None or not terms:
+        return []
+    kinds = [kind for kind in kinds or KINDS if kind in KINDS]
+    if not kinds:
+        return []
+    with connection.cursor() as cursor:
+        rows = backend.search(cursor, terms, kinds, limit)
+    return [
+        {
+            'type': KIND_NAMES[doc_id % 4],
+            'id': doc_id // 4,
+            'title_id': title_id,
+            'review_id': review_id,
+            'rank': rank,
+            'snippet': snippet,
+        }
+        for doc_id, title_id, review_id, rank, snippet in rows
+    ]
@@ -0,0 +1,287 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_migrate,
+    post_save,
+)
+from django.dispatch import Signal, receiver
+
+from reviews import search
+from reviews.models import (
+    Category,
+    CategoryStatistics,
+    Comment,
+    Genre,
+    GenreStatistics,
+    GenreTitle,
+    OutgoingEmail,
+    Review,
+    TableVersion,
+    Title,
+)
+
+
+# Отправляется после массовых операций (bulk_create, загрузка csv), которые
+# не вызывают post_save/post_delete. sender - модель, objects - созданные
+# объекты или None, если изменена вся таблица.
+bulk_changed = Signal()
+
+# Служебные модели: ответы API от них не зависят. Статистика обновляется
+# через update() и меняется только вместе с произведениями и отзывами.
+UNVERSIONED_MODELS = (
+    TableVersion,
+    OutgoingEmail,
+    GenreStatistics,
+    CategoryStatistics,
+)
+
+STATISTICS_MODELS = {Genre: GenreStatistics, Category: CategoryStatistics}
+
+
+def get_title_statistics(title_id):
+    """Статистика жанров и категории произведения."""
+    return (
+        GenreStatistics.objects.filter(genre__titles=title_id),
+        CategoryStatistics.objects.filter(category__titles=title_id),
+    )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    score = int(instance.score)
+    titles = Title.objects.filter(pk=instance.title_id)
+    statistics = get_title_statistics(instance.title_id)
+    loaded_score = getattr(instance, '_loaded_score', None)
+    if created:
+        titles.update_rating(score, 1)
+        for queryset in statistics:
+            queryset.update_totals(reviews=1, score=score)
+    elif loaded_score is None:
+        titles.rebuild_rating()
+        for queryset in statistics:
+            queryset.rebuild()
+    elif loaded_score != score:
+        titles.update_rating(score - loaded_score, 0)
+        for queryset in statistics:
+            queryset.update_totals(score=score - loaded_score)
+    instance._loaded_score = score
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    score = int(instance.score)
+    Title.objects.filter(pk=instance.title_id).update_rating(-score, -1)
+    # При удалении произведения отзывы удаляются раньше него, поэтому
+    # статистика категории уменьшается здесь, а не в
+    # update_statistics_on_title_delete.
+    for queryset in get_title_statistics(instance.title_id):
+        queryset.update_totals(reviews=-1, score=-score)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+def create_statistics(sender, instance, created, **kwargs):
+    if created:
+        STATISTICS_MODELS[sender].objects.get_or_create(pk=instance.pk)
+
+
+@receiver(post_save, sender=Title)
+def update_statistics_on_title_save(sender, instance, created, **kwargs):
+    category_id = instance.category_id
+    loaded_category_id = getattr(instance, '_loaded_category_id', None)
+    if created:
+        CategoryStatistics.objects.filter(pk=category_id).update_totals(
+            titles=1,
+            reviews=instance.rating_count,
+            score=instance.rating_sum,
+        )
+    elif loaded_category_id != category_id:
+        for pk, sign in ((loaded_category_id, -1), (category_id, 1)):
+            CategoryStatistics.objects.filter(pk=pk).update_totals(
+                titles=sign,
+                reviews=sign * instance.rating_count,
+                score=sign * instance.rating_sum,
+            )
+    instance._loaded_category_id = category_id
+
+
+@receiver(post_delete, sender=Title)
+def update_statistics_on_title_delete(sender, instance, **kwargs):
+    CategoryStatistics.objects.filter(pk=instance.category_id).update_totals(
+        titles=-1
+    )
+
+
+def update_genre_statistics(links, sign, ratings=None):
+    """Добавляет (sign=1) или вычитает (sign=-1) из статистики жанров
+    произведения по парам (genre_id, title_id) вместе с их текущими
+    оценками. ratings - уже известные {title_id: (rating_count,
+    rating_sum)}, остальные оценки читаются из базы."""
+    ratings = dict(ratings or {})
+    missing = {title_id for _, title_id in links} - ratings.keys()
+    if missing:
+        ratings.update(
+            (pk, (count, total))
+            for pk, count, total in Title.objects.filter(
+                pk__in=missing
+            ).values_list('pk', 'rating_count', 'rating_sum')
+        )
+    totals = {}
+    for genre_id, title_id in links:
+        count, total = ratings.get(title_id, (0, 0))
+        titles, reviews, score = totals.get(genre_id, (0, 0, 0))
+        totals[genre_id] = (
+            titles + sign, reviews + sign * count, score + sign * total
+        )
+    GenreStatistics.objects.update_many_totals(totals)
+
+
+@receiver(post_save, sender=GenreTitle)
+def update_statistics_on_link_save(sender, instance, created, **kwargs):
+    if created:
+        update_genre_statistics([(instance.genre_id, instance.title_id)], 1)
+
+
+@receiver(post_delete, sender=GenreTitle)
+def update_statistics_on_link_delete(sender, instance, **kwargs):
+    # Произведение удаляется после связей и отзывов, поэтому его оценки
+    # здесь ещё в базе и не учитываются дважды.
+    update_genre_statistics([(instance.genre_id, instance.title_id)], -1)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def update_statistics_on_genre_add(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    # Удаление связей через менеджер идёт через QuerySet.delete() и
+    # вызывает post_delete для каждой связи, а добавление - bulk_create.
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        links = [(instance.pk, title_id) for title_id in pk_set]
+    else:
+        links = [(genre_id, instance.pk) for genre_id in pk_set]
+    update_genre_statistics(links, 1)
+
+
+@receiver(bulk_changed, sender=Title)
+def update_statistics_on_bulk_titles(sender, objects=None, **kwargs):
+    # После загрузки целых таблиц (objects=None) статистику пересчитывает
+    # команда rebuild_statistics.
+    if objects is None:
+        return
+    totals = {}
+    for title in objects:
+        titles, reviews, score = totals.get(title.category_id, (0, 0, 0))
+        totals[title.category_id] = (
+            titles + 1,
+            reviews + title.rating_count,
+            score + title.rating_sum,
+        )
+    totals.pop(None, None)
+    CategoryStatistics.objects.update_many_totals(totals)
+
+
+@receiver(bulk_changed, sender=GenreTitle)
+def update_statistics_on_bulk_links(sender, objects=None, **kwargs):
+    if objects is None:
+        return
+    # Связи из сериализаторов создаются вместе с объектами произведений,
+    # и оценки берутся из них без запроса.
+    ratings = {
+        link.title_id: (link.title.rating_count, link.title.rating_sum)
+        for link in objects
+        if GenreTitle.title.is_cached(link)
+    }
+    update_genre_statistics(
+        [(link.genre_id, link.title_id) for link in objects], 1, ratings
+    )
+
+
+class PendingVersions:
+    """Таблицы, версии которых сдвигаются после фиксации транзакции."""
+
+    def __init__(self):
+        self.labels = set()
+
+    def __call__(self):
+        TableVersion.objects.bump(*sorted(self.labels))
+
+
+def bump_after_commit(label):
+    """Сдвигает версию таблицы после фиксации текущей транзакции, один раз
+    на таблицу за транзакцию; вне транзакции - сразу. UPDATE общей строки
+    версии не держит блокировку до конца транзакции записи, и
+    параллельные записи в таблицу не ждут друг друга на ней. При откате
+    транзакции версия не меняется."""
+    connection = transaction.get_connection()
+    for _, callback in connection.run_on_commit:
+        if isinstance(callback, PendingVersions):
+            callback.labels.add(label)
+            return
+    pending = PendingVersions()
+    pending.labels.add(label)
+    transaction.on_commit(pending)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+@receiver(bulk_changed)
+def bump_table_version(sender, **kwargs):
+    if (
+        sender._meta.app_label == 'reviews'
+        and sender not in UNVERSIONED_MODELS
+    ):
+        bump_after_commit(sender._meta.label_lower)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_genre_title_version(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_after_commit(sender._meta.label_lower)
+
+
+@receiver(post_migrate)
+def clear_search_index(sender, **kwargs):
+    if sender.name != 'reviews':
+        return
+    # Таблица индекса не модель, и flush её не очищает. После flush
+    # таблицы пусты, и документы в индексе ни на что не ссылаются.
+    if not any(
+        model.objects.exists() for model in (Title, Review, Comment)
+    ):
+        search.clear_index()
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, **kwargs):
+    search.save_documents([search.title_document(instance)])
+
+
+@receiver(post_save, sender=Review)
+def index_review(sender, instance, **kwargs):
+    search.save_documents([search.review_document(instance)])
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, **kwargs):
+    search.save_documents(search.comment_documents([instance]))
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def unindex_object(sender, instance, **kwargs):
+    search.delete_documents(sender._meta.model_name, [instance.pk])
+
+
+@receiver(bulk_changed, sender=Title)
+@receiver(bulk_changed, sender=Review)
+@receiver(bulk_changed, sender=Comment)
+def index_bulk_objects(sender, objects=None, **kwargs):
+    kind = sender._meta.model_name
+    if objects is None:
+        search.rebuild_kind(kind)
+        return
+    search.save_documents(search.build_documents(kind, objects))
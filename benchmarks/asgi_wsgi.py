@@ -0,0 +1,61 @@
+"""Сравнение пропускной способности и задержек списочных эндпоинтов под
+WSGI и ASGI.
+
+Скрипт по очереди запускает локальный сервер каждого типа (`asgi-async` -
+ASGI с асинхронными представлениями списков, YAMDB_ASYNC_VIEWS=1),
+нагружает его `--concurrency` одновременными соединениями (keep-alive) в
+течение `--duration` секунд и печатает запросы в секунду и перцентили задержки.
+
+Пример (база бенчмарков заполняется `benchmarks/run.py --seed-only`):
+
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/asgi_wsgi.py --concurrency 128 --duration 20
+"""
+import argparse
+import sys
+
+import loadgen
+
+
+DEFAULT_PATHS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/1/reviews/',
+    '/api/v1/titles/1/reviews/1/comments/',
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument(
+        '--threads', type=int, default=8, help='потоков на воркер WSGI'
+    )
+    parser.add_argument(
+        '--server', choices=loadgen.SERVERS, action='append', dest='servers'
+    )
+    parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS)
+    args = parser.parse_args()
+    results = []
+    for kind in args.servers or loadgen.SERVERS:
+        with loadgen.server(kind, args.port, args.workers, args.threads):
+            results.append((kind, loadgen.load(
+                args.port, args.paths, args.concurrency, args.duration
+            )))
+    print(
+        f'{"server":<10} {"requests":>9} {"errors":>7} {"req/s":>9} '
+        f'{"p50, ms":>9} {"p99, ms":>9}'
+    )
+    for kind, row in results:
+        print(
+            f'{kind:<10} {row["requests"]:>9} {row["errors"]:>7} '
+            f'{row["rps"]:>9.1f} {row.get("p50", 0):>9.1f} '
+            f'{row.get("p99", 0):>9.1f}'
+        )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
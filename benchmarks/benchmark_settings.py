@@ -0,0 +1,21 @@
+"""Настройки сервера для бенчмарков: отдельная база и без ограничения
+частоты запросов, которое иначе отвечало бы 429 на нагрузку с одного
+адреса."""
+import os
+
+from api_yamdb.settings import *  # noqa: F401,F403
+from api_yamdb.settings import BASE_DIR, DATABASES, REST_FRAMEWORK
+
+DEBUG = False
+
+DATABASES = {
+    **DATABASES,
+    'default': {
+        **DATABASES['default'],
+        'NAME': os.getenv(
+            'BENCHMARK_DB', str(BASE_DIR.parent / 'benchmarks' / 'db.sqlite3')
+        ),
+    },
+}
+
+REST_FRAMEWORK = {**REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}
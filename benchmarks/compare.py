@@ -0,0 +1,52 @@
+"""Сравнивает два результата run.py: python benchmarks/compare.py old.json
+new.json. Изменение задержки больше --threshold процентов в худшую
+сторону отмечается как регрессия, и скрипт завершается с кодом 1."""
+import argparse
+import json
+import sys
+
+
+METRICS = (('rps', 1), ('p50', -1), ('p99', -1), ('queries', -1))
+
+
+def change(old, new):
+    if old in (None, 0) or new is None:
+        return None
+    return (new - old) / old * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('old', type=argparse.FileType())
+    parser.add_argument('new', type=argparse.FileType())
+    parser.add_argument('--threshold', type=float, default=10)
+    args = parser.parse_args()
+    old, new = json.load(args.old), json.load(args.new)
+    if old['dataset'] != new['dataset']:
+        print('Внимание: результаты получены на разных наборах данных.')
+    print(f'{old["commit"]} -> {new["commit"]}')
+    regressions = 0
+    for name, row in new['results'].items():
+        base = old['results'].get(name)
+        if base is None:
+            continue
+        cells = []
+        for metric, better in METRICS:
+            delta = change(base.get(metric), row.get(metric))
+            if delta is None:
+                cells.append(f'{metric} -')
+                continue
+            mark = ''
+            if delta * better < -args.threshold:
+                mark = ' !'
+                regressions += 1
+            cells.append(
+                f'{metric} {base[metric]:.1f} -> {row[metric]:.1f} '
+                f'({delta:+.0f}%){mark}'
+            )
+        print(f'{name:<15} ' + '  '.join(cells))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
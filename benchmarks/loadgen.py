@@ -0,0 +1,180 @@
+"""Общие части бенчмарков: запуск локального сервера и генератор нагрузки
+на asyncio с соединениями keep-alive."""
+import asyncio
+import os
+import statistics
+import subprocess
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+PROJECT_DIR = BENCHMARKS_DIR.parent / 'api_yamdb'
+SETTINGS_MODULE = 'benchmark_settings'
+WSGI_COMMAND = (
+    'gunicorn api_yamdb.wsgi:application --bind 127.0.0.1:{port} '
+    '--workers {workers} --threads {threads} --log-level warning'
+)
+ASGI_COMMAND = (
+    'uvicorn api_yamdb.asgi:application --port {port} '
+    '--workers {workers} --log-level warning --no-access-log'
+)
+# Команда запуска сервера и значение YAMDB_ASYNC_VIEWS.
+SERVERS = {
+    'wsgi': (WSGI_COMMAND, '0'),
+    'asgi': (ASGI_COMMAND, '0'),
+    'asgi-async': (ASGI_COMMAND, '1'),
+}
+
+
+def get_env(**extra):
+    pythonpath = os.pathsep.join(
+        filter(None, [str(BENCHMARKS_DIR), os.environ.get('PYTHONPATH')])
+    )
+    return {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': SETTINGS_MODULE,
+        'PYTHONPATH': pythonpath,
+        **extra,
+    }
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('соединение закрыто сервером')
+    length = 0
+    keep_alive = True
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name = name.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'connection' and value.strip().lower() == 'close':
+            keep_alive = False
+    body = await reader.readexactly(length)
+    return int(status_line.split()[1]), keep_alive, body
+
+
+def build_request(path, headers=None):
+    lines = [f'GET {path} HTTP/1.1', 'Host: 127.0.0.1']
+    lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+    lines.append('Accept: application/json')
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode()
+
+
+def fetch(port, path, headers=None):
+    """Один GET-запрос; возвращает (статус, тело)."""
+    async def run():
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            writer.write(build_request(path, headers))
+            status, _, body = await read_response(reader)
+            return status, body
+        finally:
+            writer.close()
+
+    return asyncio.run(run())
+
+
+async def worker(port, paths, offset, deadline, latencies, errors):
+    reader = writer = None
+    index = offset
+    while time.monotonic() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(
+                    '127.0.0.1', port
+                )
+            writer.write(build_request(path))
+            status, keep_alive, _ = await read_response(reader)
+        except (ConnectionError, OSError, asyncio.IncompleteReadError):
+            errors.append(path)
+            writer = None
+            continue
+        latencies.append(time.perf_counter() - started)
+        if status != 200:
+            errors.append(path)
+        if not keep_alive:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(port, paths, concurrency, duration):
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(
+        worker(port, paths, offset, deadline, latencies, errors)
+        for offset in range(concurrency)
+    ))
+    return latencies, errors
+
+
+def load(port, paths, concurrency, duration, warmup=1):
+    """Прогрев и замер; возвращает сводку по задержкам."""
+    if warmup:
+        asyncio.run(run_load(port, paths, concurrency, warmup))
+    latencies, errors = asyncio.run(
+        run_load(port, paths, concurrency, duration)
+    )
+    return summarize(latencies, errors, duration)
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summarize(latencies, errors, duration):
+    latencies = sorted(latencies)
+    if not latencies:
+        return {'requests': 0, 'errors': len(errors), 'rps': 0}
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': len(latencies) / duration,
+        'p50': statistics.median(latencies) * 1000,
+        'p90': percentile(latencies, 0.90) * 1000,
+        'p99': percentile(latencies, 0.99) * 1000,
+        'max': latencies[-1] * 1000,
+    }
+
+
+def wait_for_port(port, timeout=30):
+    async def probe():
+        _, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.close()
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            asyncio.run(probe())
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'сервер не запустился на порту {port}')
+
+
+@contextmanager
+def server(kind, port, workers=1, threads=8, **env):
+    command, async_views = SERVERS[kind]
+    command = command.format(port=port, workers=workers, threads=threads)
+    process = subprocess.Popen(
+        command.split(),
+        cwd=PROJECT_DIR,
+        env=get_env(YAMDB_ASYNC_VIEWS=async_views, **env),
+    )
+    try:
+        wait_for_port(port)
+        yield process
+    finally:
+        process.terminate()
+        process.wait()
@@ -0,0 +1,280 @@
+"""Нагрузочный бенчмарк API.
+
+Заполняет отдельную базу синтетическими данными нужного масштаба,
+запускает локальный сервер и по очереди нагружает каждый сценарий
+`--concurrency` одновременными клиентами. Для каждого сценария
+записываются запросы в секунду, перцентили задержки и число SQL-запросов
+на запрос (из /api/v1/metrics/). Результат сохраняется в
+benchmarks/results/<время>-<коммит>.json; два результата сравнивает
+compare.py.
+
+Пример:
+
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/run.py --scale small --duration 10
+    python benchmarks/run.py --scale large --only titles-list reviews-list
+"""
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import loadgen
+
+
+SCALES = {
+    'small': {
+        'users': 1000, 'titles': 1000, 'reviews': 20000, 'comments': 20000,
+    },
+    'medium': {
+        'users': 10000,
+        'titles': 10000,
+        'reviews': 1000000,
+        'comments': 500000,
+    },
+    'large': {
+        'users': 100000,
+        'titles': 100000,
+        'reviews': 10000000,
+        'comments': 1000000,
+    },
+}
+RESULTS_DIR = loadgen.BENCHMARKS_DIR / 'results'
+PATHS_PER_SCENARIO = 256
+PAGE_SIZE = 10
+METRICS_RE = re.compile(
+    r'^yamdb_request_db_queries_(sum|count)'
+    r'\{route="([^"]*)",method="GET"\} (\S+)$',
+    re.MULTILINE,
+)
+
+
+def setup_django(db_path):
+    os.environ['DJANGO_SETTINGS_MODULE'] = loadgen.SETTINGS_MODULE
+    os.environ['BENCHMARK_DB'] = str(db_path)
+    sys.path[:0] = [str(loadgen.PROJECT_DIR), str(loadgen.BENCHMARKS_DIR)]
+    import django
+
+    django.setup()
+
+
+def prepare_database(db_path, counts, rng_seed):
+    """Заполняет базу, если она ещё не заполнена тем же набором."""
+    from django.core.management import call_command
+    from django.db import connections
+
+    marker = Path(f'{db_path}.json')
+    dataset = {'counts': counts, 'seed': rng_seed}
+    if db_path.exists() and marker.exists():
+        if json.loads(marker.read_text()) == dataset:
+            return
+    for path in (db_path, marker):
+        if path.exists():
+            path.unlink()
+    call_command('migrate', verbosity=0)
+    started = time.monotonic()
+    call_command('generate_data', seed=rng_seed, **counts)
+    print(f'база заполнена за {time.monotonic() - started:.1f} с')
+    connections.close_all()
+    marker.write_text(json.dumps(dataset))
+
+
+def get_admin_token():
+    from api.v1.authentication import ClaimsAccessToken
+    from django.db import connections
+    from reviews.models import User
+
+    admin, _ = User.objects.get_or_create(
+        username='benchmark_admin',
+        defaults={
+            'email': 'benchmark_admin@yamdb.fake',
+            'role': User.ADMIN,
+            'is_superuser': True,
+        },
+    )
+    token = str(ClaimsAccessToken.for_user(admin))
+    connections.close_all()
+    return token
+
+
+def get_sample_objects(counts, rng):
+    """Пары (произведение, отзыв) и slug жанров из базы: распределение
+    отзывов по произведениям задаёт generate_data."""
+    from django.db import connections
+    from reviews.models import Genre, Review
+
+    review_ids = [
+        rng.randint(1, counts['reviews']) for _ in range(PATHS_PER_SCENARIO)
+    ]
+    reviews = dict(
+        Review.objects.filter(pk__in=review_ids).values_list('pk', 'title_id')
+    )
+    pairs = [(reviews[pk], pk) for pk in review_ids]
+    genres = list(Genre.objects.values_list('slug', flat=True))
+    connections.close_all()
+    return pairs, genres
+
+
+def build_scenarios(counts, rng):
+    from reviews.management.commands.generate_data import WORDS
+
+    titles = counts['titles']
+    pages = max(1, min(50, titles // PAGE_SIZE))
+    pairs, genres = get_sample_objects(counts, rng)
+
+    def sample(build):
+        return [build() for _ in range(PATHS_PER_SCENARIO)]
+
+    def review_path():
+        title_id, review_id = rng.choice(pairs)
+        return f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+
+    return {
+        'categories': ('categories-list', ['/api/v1/categories/']),
+        'genres': ('genres-list', ['/api/v1/genres/']),
+        'titles-list': ('titles-list', sample(
+            lambda: f'/api/v1/titles/?page={rng.randint(1, pages)}'
+        )),
+        'titles-filter': ('titles-list', sample(
+            lambda: f'/api/v1/titles/?genre={rng.choice(genres)}'
+            f'&year={rng.randint(1950, 2023)}'
+        )),
+        'title-detail': ('titles-detail', sample(
+            lambda: f'/api/v1/titles/{rng.randint(1, titles)}/'
+        )),
+        'reviews-list': ('reviews-list', sample(
+            lambda: f'/api/v1/titles/{rng.randint(1, titles)}/reviews/'
+        )),
+        'reviews-cursor': ('reviews-list', sample(
+            lambda: f'/api/v1/titles/{rng.randint(1, titles)}/reviews/'
+            '?pagination=cursor'
+        )),
+        'comments-list': ('comments-list', sample(review_path)),
+        'search': (None, sample(
+            lambda: f'/api/v1/search/?q={rng.choice(WORDS)}'
+        )),
+    }
+
+
+def read_query_counts(port, token):
+    status, body = loadgen.fetch(
+        port, '/api/v1/metrics/', {'Authorization': f'Bearer {token}'}
+    )
+    if status != 200:
+        raise RuntimeError(f'/api/v1/metrics/ ответил {status}')
+    counts = {}
+    for kind, route, value in METRICS_RE.findall(body.decode()):
+        counts.setdefault(route, {})[kind] = float(value)
+    return counts
+
+
+def queries_per_request(before, after, route):
+    if route is None:
+        return None
+    new, old = after.get(route, {}), before.get(route, {})
+    requests = new.get('count', 0) - old.get('count', 0)
+    if not requests:
+        return None
+    return (new.get('sum', 0) - old.get('sum', 0)) / requests
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=loadgen.BENCHMARKS_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    for name in ('users', 'titles', 'reviews', 'comments'):
+        parser.add_argument(f'--{name}', type=int, help='вместо --scale')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--db', type=Path, default=loadgen.BENCHMARKS_DIR / 'db.sqlite3'
+    )
+    parser.add_argument('--server', choices=loadgen.SERVERS, default='wsgi')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--only', nargs='*', help='сценарии для запуска')
+    parser.add_argument(
+        '--seed-only', action='store_true', help='только заполнить базу'
+    )
+    parser.add_argument('--output', type=Path, help='файл результата')
+    args = parser.parse_args()
+
+    counts = {
+        name: getattr(args, name) or value
+        for name, value in SCALES[args.scale].items()
+    }
+    db_path = args.db.resolve()
+    setup_django(db_path)
+    prepare_database(db_path, counts, args.seed)
+    if args.seed_only:
+        return 0
+    token = get_admin_token()
+    scenarios = build_scenarios(counts, random.Random(args.seed))
+    results = {}
+    env = {'BENCHMARK_DB': str(db_path)}
+    with loadgen.server(
+        args.server, args.port, args.workers, args.threads, **env
+    ):
+        for name, (route, paths) in scenarios.items():
+            if args.only and name not in args.only:
+                continue
+            before = read_query_counts(args.port, token)
+            row = loadgen.load(
+                args.port, paths, args.concurrency, args.duration
+            )
+            row['queries'] = queries_per_request(
+                before, read_query_counts(args.port, token), route
+            )
+            results[name] = row
+            print(format_row(name, row), flush=True)
+
+    report = {
+        'commit': get_commit(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'dataset': {'counts': counts, 'seed': args.seed},
+        'config': {
+            name: getattr(args, name)
+            for name in ('server', 'workers', 'threads', 'concurrency',
+                         'duration')
+        },
+        'results': results,
+    }
+    output = args.output or RESULTS_DIR / (
+        f'{time.strftime("%Y%m%d-%H%M%S")}-{report["commit"]}.json'
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f'Результат: {output}')
+    return 0
+
+
+def format_row(name, row):
+    queries = row.get('queries')
+    queries = '-' if queries is None else f'{queries:.1f}'
+    return (
+        f'{name:<15} {row["rps"]:>8.1f} req/s  '
+        f'p50 {row.get("p50", 0):>7.1f}  p90 {row.get("p90", 0):>7.1f}  '
+        f'p99 {row.get("p99", 0):>7.1f} ms  queries {queries:>4}  '
+        f'errors {row["errors"]}'
+    )
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Скорость сериализации списков: сериализаторы DRF против планов
+api.plans.
+
+Для произведений, отзывов и комментариев берутся одни и те же строки
+и измеряются два времени на строку:
+
+- serialize - только сериализация уже загруженных объектов (экземпляры
+  моделей для DRF, словари values() для плана);
+- total - запрос, загрузка строк и сериализация, как в представлении
+  списка.
+
+Пример:
+
+    python benchmarks/serializers.py --rows 1000 --repeat 5
+"""
+import argparse
+import time
+from pathlib import Path
+
+import loadgen
+import run
+
+
+def best_time(function, repeat, setup=tuple):
+    """Лучшее время function(*setup()); setup не входит в замер."""
+    best = None
+    for _ in range(repeat):
+        args = setup()
+        started = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def get_cases(rows):
+    from django.db.models import Count, Prefetch
+
+    from api.v1.serializers import (
+        CommentSerializer,
+        ReviewSerializer,
+        TitleSerializer,
+    )
+    from reviews.models import Comment, Genre, Review, Title
+
+    busiest_title = Title.objects.annotate(
+        total=Count('reviews')
+    ).order_by('-total').values_list('pk', flat=True)[0]
+    return {
+        'titles': (
+            TitleSerializer,
+            Title.objects.select_related('category').prefetch_related(
+                Prefetch('genre', queryset=Genre.objects.order_by('id'))
+            ).order_by('id')[:rows],
+        ),
+        'reviews': (
+            ReviewSerializer,
+            Review.objects.select_related('author').filter(
+                title_id=busiest_title
+            ).order_by('id')[:rows],
+        ),
+        'comments': (
+            CommentSerializer,
+            Comment.objects.select_related('author').order_by('id')[:rows],
+        ),
+    }
+
+
+def measure(serializer_class, queryset, repeat):
+    from api.plans import get_plan
+
+    plan = get_plan(serializer_class)
+    instances = list(queryset.all())
+    rows = list(plan.values(queryset.all()))
+    plan.attach_relations(rows)
+    count = len(rows)
+    assert plan.represent([dict(row) for row in rows]) == serializer_class(
+        instances, many=True
+    ).data, f'{serializer_class.__name__}: ответы различаются'
+    timings = {
+        'drf serialize': best_time(
+            lambda: serializer_class(instances, many=True).data, repeat
+        ),
+        # represent заменяет даты в строках, поэтому каждый замер идёт на
+        # свежих копиях.
+        'plan serialize': best_time(
+            plan.represent, repeat, lambda: ([dict(row) for row in rows],)
+        ),
+        'drf total': best_time(
+            lambda: serializer_class(queryset.all(), many=True).data, repeat
+        ),
+        'plan total': best_time(
+            lambda: plan.serialize(plan.values(queryset.all())), repeat
+        ),
+    }
+    return count, {
+        name: elapsed / count * 1e6 for name, elapsed in timings.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=run.SCALES, default='small')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--db', type=Path, default=loadgen.BENCHMARKS_DIR / 'db.sqlite3'
+    )
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    db_path = args.db.resolve()
+    run.setup_django(db_path)
+    run.prepare_database(db_path, run.SCALES[args.scale], args.seed)
+    print('мкс на строку (лучшее из --repeat)')
+    for name, (serializer_class, queryset) in get_cases(args.rows).items():
+        count, timings = measure(serializer_class, queryset, args.repeat)
+        serialize = timings['drf serialize'] / timings['plan serialize']
+        total = timings['drf total'] / timings['plan total']
+        print(
+            f'{name:<9} {count:>5} строк  '
+            f'serialize {timings["drf serialize"]:7.1f} -> '
+            f'{timings["plan serialize"]:6.1f} (x{serialize:.1f})  '
+            f'total {timings["drf total"]:7.1f} -> '
+            f'{timings["plan total"]:6.1f} (x{total:.1f})'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -33,3 +34,17 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(autouse=True)
+def send_queued_mail_immediately(settings):
+    # Тесты регистрации проверяют mail.outbox сразу после запроса.
+    settings.MAIL_QUEUE_EAGER = True
+
+
+@pytest.fixture(autouse=True)
+def reset_throttling():
+    from api.v1.throttling import get_bucket_store
+
+    # Все тесты идут с одного адреса и не должны делить лимиты.
+    get_bucket_store().clear()
@@ -0,0 +1,116 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_review_changes(self, admin_client, admin,
+                                              user, user_client, moderator,
+                                              moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения равен средней оценке '
+            'его отзывов.'
+        )
+
+        user_client.patch(f'{url}{reviews[1]["id"]}/', data={'score': 8})
+        assert self.get_rating(admin_client, title_id) == 6, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки отзыва.'
+        )
+
+        user_client.delete(f'{url}{reviews[1]["id"]}/')
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+        admin_client.delete(f'{url}{reviews[0]["id"]}/')
+        moderator_client.delete(f'{url}{reviews[2]["id"]}/')
+        assert self.get_rating(admin_client, title_id) is None, (
+            'Проверьте, что после удаления всех отзывов рейтинг '
+            'произведения равен `None`.'
+        )
+
+    def test_02_rebuild_ratings_command(self, admin_client, admin, user,
+                                        user_client):
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        from reviews.models import Title
+
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+        call_command('rebuild_ratings')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (10, 2), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает сумму '
+            'и количество оценок произведения.'
+        )
+        assert title.rating == 5, (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает рейтинг '
+            'произведения.'
+        )
+
+    def test_03_write_response_rating_is_integer(self, admin_client, admin,
+                                                 user, user_client):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'year': 1985}
+        )
+        assert response.status_code == HTTPStatus.OK
+        rating = response.json()['rating']
+        assert rating == 5 and isinstance(rating, int), (
+            'Проверьте, что ответ на PATCH-запрос к произведению выводит '
+            'рейтинг целым числом, как и GET-запрос.'
+        )
+
+    def test_04_review_write_is_atomic(self, admin_client, admin, user,
+                                       user_client, moderator_client,
+                                       monkeypatch):
+        from reviews import search
+        from reviews.models import CategoryStatistics, Review, Title
+
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        statistics = CategoryStatistics.objects.get(pk=title.category_id)
+
+        def fail(documents):
+            raise RuntimeError('Индекс недоступен')
+
+        monkeypatch.setattr(search, 'save_documents', fail)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        with pytest.raises(RuntimeError):
+            moderator_client.post(url, data={'text': 'Отзыв', 'score': 1})
+        with pytest.raises(RuntimeError):
+            user_client.patch(f'{url}{reviews[1]["id"]}/', data={'score': 1})
+        assert Review.objects.filter(title=title).count() == 2, (
+            'Проверьте, что отзыв не сохраняется, если обработка его '
+            'сохранения завершилась ошибкой.'
+        )
+        title.refresh_from_db()
+        assert (title.rating_count, title.rating_sum) == (2, 10), (
+            'Проверьте, что рейтинг произведения меняется в одной '
+            'транзакции с отзывом.'
+        )
+        statistics.refresh_from_db()
+        assert statistics.review_count == 2
@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    def count_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        return len(context.captured_queries)
+
+    def add_titles(self, count):
+        from reviews.models import Category, Genre, GenreTitle, Title
+
+        category = Category.objects.first()
+        genres = list(Genre.objects.all())
+        for idx in range(count):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category
+            )
+            for genre in genres:
+                GenreTitle.objects.create(title=title, genre=genre)
+
+    def test_01_titles_list_query_count_is_fixed(self, admin_client, client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        queries_before = self.count_queries(client, url)
+
+        self.add_titles(5)
+        queries_after = self.count_queries(client, url)
+        assert queries_after == queries_before, (
+            f'Проверьте, что GET-запрос к `{url}` выполняет одинаковое '
+            'количество SQL-запросов независимо от числа произведений на '
+            f'странице: было {queries_before}, стало {queries_after}.'
+        )
+
+    def test_02_title_detail_query_count(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        queries = self.count_queries(client, url)
+        # Произведение с категорией, жанры и версии таблиц для Last-Modified.
+        assert queries <= 3, (
+            f'Проверьте, что GET-запрос к `{url}` загружает категорию '
+            'вместе с произведением и получает жанры одним запросом. '
+            f'Сейчас выполняется {queries} SQL-запросов.'
+        )
@@ -0,0 +1,131 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10Pagination:
+
+    def create_genres(self, count):
+        from reviews.models import Genre
+
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {idx}', slug=f'genre-{idx}')
+            for idx in range(count)
+        )
+
+    def collect(self, client, url):
+        items = []
+        pages = 0
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+                'статусом 200.'
+            )
+            data = response.json()
+            items.extend(data['results'])
+            url = data['next']
+            pages += 1
+        return items, pages
+
+    def test_01_count_can_be_skipped(self, client):
+        self.create_genres(15)
+        url = '/api/v1/genres/'
+        data = client.get(url).json()
+        assert data.get('count') == 15, (
+            f'Проверьте, что для эндпоинта `{url}` настроена пагинация.'
+        )
+
+        data = client.get(f'{url}?count=false').json()
+        assert 'count' not in data, (
+            f'Проверьте, что GET-запрос к `{url}?count=false` не возвращает '
+            'общее количество объектов.'
+        )
+        assert len(data['results']) == 10 and data['next'], (
+            f'Проверьте, что GET-запрос к `{url}?count=false` возвращает '
+            'страницу и ссылку на следующую.'
+        )
+        items, pages = self.collect(client, f'{url}?count=false')
+        assert (len(items), pages) == (15, 2)
+
+    def test_02_cursor_pagination(self, client):
+        self.create_genres(25)
+        url = '/api/v1/genres/?pagination=cursor'
+        items, pages = self.collect(client, url)
+        assert pages == 3, (
+            f'Проверьте, что GET-запрос к `{url}` переключает эндпоинт на '
+            'пагинацию по курсору.'
+        )
+        slugs = [item['slug'] for item in items]
+        assert slugs == [f'genre-{idx}' for idx in range(25)], (
+            'Проверьте, что пагинация по курсору возвращает все объекты '
+            'по одному разу в порядке `id`.'
+        )
+
+        data = client.get(url).json()
+        next_page = client.get(data['next']).json()
+        previous_page = client.get(next_page['previous']).json()
+        assert previous_page['results'] == data['results'], (
+            'Проверьте, что ссылка `previous` при пагинации по курсору '
+            'ведёт на предыдущую страницу.'
+        )
+
+        response = client.get('/api/v1/genres/?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_reviews_cursor_pagination(self, admin_client, admin, user,
+                                          user_client, moderator,
+                                          moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            '?pagination=cursor&count=false'
+        )
+        items, _ = self.collect(admin_client, url)
+        assert [item['id'] for item in items] == [
+            review['id'] for review in reviews
+        ], (
+            'Проверьте, что пагинация по курсору для отзывов упорядочена по '
+            '`pub_date` и `id`.'
+        )
+
+    def test_04_tampered_cursors(self, admin_client, admin, user,
+                                 user_client, client):
+        import base64
+        import json
+
+        def encode(position):
+            return base64.urlsafe_b64encode(
+                json.dumps({'p': position}).encode()
+            ).decode().rstrip('=')
+
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        cases = {
+            '/api/v1/titles/': (['abc'], [[1]], [None], [2 ** 70]),
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/': (
+                [None, 1], ['zzz', 'q'], [[1], 1], ['2020-01-01', {}],
+            ),
+        }
+        for url, positions in cases.items():
+            for position in positions:
+                response = client.get(f'{url}?cursor={encode(position)}')
+                assert response.status_code == HTTPStatus.NOT_FOUND, (
+                    f'Проверьте, что курсор с позицией {position} для '
+                    f'`{url}` отклоняется с ответом 404.'
+                )
+        response = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/?cursor='
+            + encode(['2000-01-01T00:00:00Z', 0])
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) == len(reviews)
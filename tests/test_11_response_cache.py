@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_categories, create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ResponseCache:
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        return response.json(), len(context.captured_queries)
+
+    def test_01_catalog_list_is_cached(self, admin_client, client):
+        create_categories(admin_client)
+        url = '/api/v1/categories/'
+        first, _ = self.get(client, url)
+        second, queries = self.get(client, url)
+        assert second == first and queries == 1, (
+            f'Проверьте, что повторный GET-запрос к `{url}` отдаётся из '
+            'кэша и читает из базы только версии таблиц.'
+        )
+
+        admin_client.post(url, data={'name': 'Музыка', 'slug': 'music'})
+        data, _ = self.get(client, url)
+        assert data['count'] == 3, (
+            f'Проверьте, что кэш `{url}` сбрасывается при создании '
+            'категории.'
+        )
+
+    def test_02_titles_cache_follows_reviews(self, admin_client, admin,
+                                             client, user, user_client):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = '/api/v1/titles/'
+        self.get(client, url)
+        user_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/',
+            data={'score': 9}
+        )
+        data, _ = self.get(client, url)
+        rating = {
+            title['id']: title['rating'] for title in data['results']
+        }[titles[0]['id']]
+        assert rating == 7, (
+            f'Проверьте, что кэш `{url}` сбрасывается при изменении '
+            'отзыва, влияющего на рейтинг.'
+        )
+
+    def test_03_cache_follows_writes_of_other_processes(self, admin_client,
+                                                        client):
+        from reviews.models import Category, TableVersion
+
+        create_categories(admin_client)
+        url = '/api/v1/categories/'
+        self.get(client, url)
+        # Запись другого процесса: сигналы этого процесса не вызываются,
+        # меняются только строки и версия таблицы в базе.
+        Category.objects.filter(slug='films').update(name='Кино')
+        TableVersion.objects.bump(Category._meta.label_lower)
+        data, _ = self.get(client, url)
+        assert 'Кино' in [item['name'] for item in data['results']], (
+            f'Проверьте, что кэш `{url}` сбрасывается по версиям таблиц в '
+            'базе, а не только в процессе, выполнившем запись.'
+        )
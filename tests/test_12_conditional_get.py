@@ -0,0 +1,168 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ConditionalGet:
+
+    def test_01_titles_list_not_modified(self, admin_client, client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        response = client.get(url)
+        etag = response.get('ETag')
+        assert etag and response.get('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert len(context.captured_queries) <= 1, (
+            f'Проверьте, что для ответа 304 на `{url}` строки списка не '
+            'загружаются.'
+        )
+
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Музыка', 'slug': 'music'}
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после изменения данных GET-запрос к `{url}` со '
+            'старым `If-None-Match` возвращает ответ со статусом 200.'
+        )
+
+    def test_02_comment_detail_not_modified(self, admin_client, admin,
+                                            client, user, user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            f'comments/{comments[1]["id"]}/'
+        )
+        response = client.get(url)
+        last_modified = response['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-Modified-Since` возвращает ответ со статусом 304.'
+        )
+
+        user_client.patch(url, data={'text': 'Новый текст'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после изменения комментария GET-запрос к '
+            f'`{url}` со старым `If-None-Match` возвращает ответ со '
+            'статусом 200.'
+        )
+        assert response.json()['text'] == 'Новый текст'
+
+    def test_03_detail_etag_follows_own_row(self, admin_client, admin,
+                                            client, user, user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        other_url = f'/api/v1/titles/{titles[1]["id"]}/'
+        comment_url = (
+            f'{title_url}reviews/{reviews[0]["id"]}/'
+            f'comments/{comments[0]["id"]}/'
+        )
+        etags = {
+            url: client.get(url)['ETag']
+            for url in (title_url, other_url, comment_url)
+        }
+
+        user_client.post(
+            f'{other_url}reviews/', data={'text': 'Отзыв', 'score': 3}
+        )
+        user_client.patch(
+            f'{title_url}reviews/{reviews[0]["id"]}/'
+            f'comments/{comments[1]["id"]}/',
+            data={'text': 'Новый текст'},
+        )
+        for url in (title_url, comment_url):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что ETag `{url}` не меняется от изменений '
+                'других объектов.'
+            )
+        response = client.get(other_url, HTTP_IF_NONE_MATCH=etags[other_url])
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ETag произведения меняется вместе с его '
+            'рейтингом.'
+        )
+
+        admin_client.patch(
+            title_url, data={'genre': titles[0]['genre'][:1]}
+        )
+        response = client.get(title_url, HTTP_IF_NONE_MATCH=etags[title_url])
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ETag произведения меняется вместе с его жанрами.'
+        )
+
+    def test_04_etag_depends_on_renderer(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        for url in ('/api/v1/titles/', f'/api/v1/titles/{titles[0]["id"]}/'):
+            html = client.get(url, HTTP_ACCEPT='text/html')
+            response = client.get(url, HTTP_ACCEPT='application/json')
+            assert html['ETag'] != response['ETag'], (
+                f'Проверьте, что ETag `{url}` различается для JSON и HTML '
+                'браузерного API.'
+            )
+            assert 'Accept' in response['Vary']
+            response = client.get(
+                url,
+                HTTP_ACCEPT='application/json',
+                HTTP_IF_NONE_MATCH=html['ETag'],
+            )
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что JSON-запрос к `{url}` с ETag HTML-ответа '
+                'получает ответ со статусом 200.'
+            )
+            response = client.get(
+                url, HTTP_ACCEPT='text/html', HTTP_IF_NONE_MATCH=html['ETag']
+            )
+            assert response.status_code == HTTPStatus.NOT_MODIFIED
+            assert 'Accept' in response['Vary']
+
+    def test_05_versions_bump_after_commit(self):
+        from django.db import transaction
+
+        from reviews.models import Category, TableVersion
+
+        def version():
+            [(value, _)] = TableVersion.objects.for_labels(
+                [Category._meta.label_lower]
+            )
+            return value
+
+        with transaction.atomic():
+            Category.objects.create(name='Фильм', slug='films')
+            Category.objects.create(name='Книги', slug='books')
+            assert version() == 0, (
+                'Проверьте, что версия таблицы сдвигается после фиксации '
+                'транзакции, а не внутри неё.'
+            )
+        assert version() == 1, (
+            'Проверьте, что версия таблицы сдвигается один раз за '
+            'транзакцию.'
+        )
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                Category.objects.create(name='Музыка', slug='music')
+                raise RuntimeError
+        assert version() == 1, (
+            'Проверьте, что откат транзакции не сдвигает версию таблицы.'
+        )
+        Category.objects.create(name='Музыка', slug='music')
+        assert version() == 2
@@ -0,0 +1,96 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_categories, create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TitleBulkCreate:
+    url = '/api/v1/titles/bulk/'
+
+    def make_items(self, count, genres, categories):
+        return [
+            {
+                'name': f'Произведение {idx}',
+                'year': 2000 + idx % 20,
+                'genre': [genres[idx % 3]['slug'], genres[0]['slug']],
+                'category': categories[idx % 2]['slug'],
+            }
+            for idx in range(count)
+        ]
+
+    def test_01_bulk_create(self, admin_client, user_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        items = self.make_items(50, genres, categories)
+
+        response = user_client.post(self.url, data=items, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что POST-запрос пользователя к `{self.url}` '
+            'возвращает ответ со статусом 403.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.url, data=items, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{self.url}` с '
+            'корректными данными возвращает ответ со статусом 201.'
+        )
+        created = response.json()['created']
+        assert len(created) == len(items), (
+            f'Проверьте, что POST-запрос к `{self.url}` создаёт все '
+            'переданные произведения.'
+        )
+        assert len(context.captured_queries) < 20, (
+            f'Проверьте, что POST-запрос к `{self.url}` не выполняет '
+            'запросы для каждого произведения.'
+        )
+
+        title = created[7]
+        response = admin_client.get(f'/api/v1/titles/{title["id"]}/')
+        data = response.json()
+        assert data['name'] == items[7]['name'], (
+            'Проверьте, что созданные произведения получают верные `id`.'
+        )
+        assert sorted(genre['slug'] for genre in data['genre']) == sorted(
+            set(items[7]['genre'])
+        ), 'Проверьте, что созданные произведения связаны с жанрами.'
+
+    def test_02_bulk_create_reports_item_errors(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        items = self.make_items(3, genres, categories)
+        items[1]['category'] = 'unknown'
+        items[2]['year'] = 'дветыщи'
+
+        response = admin_client.post(self.url, data=items, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        data = response.json()
+        assert len(data['created']) == 1, (
+            f'Проверьте, что POST-запрос к `{self.url}` создаёт корректные '
+            'элементы, даже если часть элементов содержит ошибки.'
+        )
+        assert [error['index'] for error in data['errors']] == [1, 2], (
+            f'Проверьте, что ответ на POST-запрос к `{self.url}` содержит '
+            'ошибки с индексами некорректных элементов.'
+        )
+
+        response = admin_client.post(self.url, data=items[1:], format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_ids_outside_transaction(self):
+        from reviews.models import Title
+
+        assert not connection.in_atomic_block
+        titles = Title.objects.bulk_create_with_ids(
+            [Title(name=f'Произведение {i}', year=2000) for i in range(5)]
+        )
+        assert [
+            Title.objects.get(pk=title.pk).name for title in titles
+        ] == [title.name for title in titles], (
+            'Проверьте, что `bulk_create_with_ids` сам открывает транзакцию '
+            'и заполняет верные `id` вне внешней транзакции.'
+        )
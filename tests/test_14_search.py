@@ -0,0 +1,115 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14Search:
+    url = '/api/v1/search/'
+
+    def search(self, client, query, **params):
+        response = client.get(self.url, data={'q': query, **params})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return response.json()['results']
+
+    def test_01_search_titles_reviews_comments(self, admin_client, admin,
+                                               client, user, user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        results = self.search(client, 'терминатор')
+        assert [(item['type'], item['id']) for item in results] == [
+            ('title', titles[0]['id'])
+        ], (
+            f'Проверьте, что `{self.url}` находит произведение по названию.'
+        )
+
+        results = self.search(client, 'review number', type='review')
+        assert {item['id'] for item in results} == {
+            review['id'] for review in reviews
+        }, f'Проверьте, что `{self.url}` находит отзывы по тексту.'
+
+        results = self.search(client, 'comment', type='comment')
+        assert {item['id'] for item in results} == {
+            comment['id'] for comment in comments
+        }, f'Проверьте, что `{self.url}` находит комментарии по тексту.'
+        assert all(
+            item['review_id'] == reviews[0]['id']
+            and item['title_id'] == titles[0]['id']
+            for item in results
+        )
+
+    def test_02_index_follows_changes(self, admin_client, admin, client,
+                                      user, user_client):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/'
+        user_client.patch(url, data={'text': 'неожиданный поворот'})
+        results = self.search(client, 'неожиданный')
+        assert [(item['type'], item['id']) for item in results] == [
+            ('review', reviews[1]['id'])
+        ], 'Проверьте, что индекс обновляется при изменении отзыва.'
+
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert self.search(client, 'терминатор') == [], (
+            'Проверьте, что документы удаляются из индекса вместе с '
+            'объектами.'
+        )
+        assert self.search(client, 'comment') == [], (
+            'Проверьте, что при удалении произведения из индекса удаляются '
+            'его отзывы и комментарии.'
+        )
+
+    def test_03_query_is_required(self, client):
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_comment_documents_are_batched(self, admin_client, admin,
+                                              user, user_client):
+        from reviews import search
+        from reviews.models import Comment
+
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        comments = list(Comment.objects.order_by('pk'))
+        with CaptureQueriesContext(connection) as context:
+            documents = search.comment_documents(comments)
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что id произведений комментариев читаются одним '
+            'запросом, а не по запросу на комментарий.'
+        )
+        assert {document[1] for document in documents} == {titles[0]['id']}
+
+        comments = list(Comment.objects.select_related('review'))
+        with CaptureQueriesContext(connection) as context:
+            search.comment_documents(comments)
+        assert not context.captured_queries, (
+            'Проверьте, что для загруженных отзывов id произведения не '
+            'читается из базы.'
+        )
+
+    def test_05_index_table_migration(self):
+        from reviews.search import TABLE
+
+        executor = MigrationExecutor(connection)
+        try:
+            executor.migrate([('reviews', '0005_statistics')])
+            assert TABLE not in connection.introspection.table_names(), (
+                'Проверьте, что обратная миграция удаляет таблицу индекса.'
+            )
+        finally:
+            executor.loader.build_graph()
+            executor.migrate([('reviews', '0006_search_index')])
+        assert TABLE in connection.introspection.table_names(), (
+            'Проверьте, что таблица индекса создаётся миграцией.'
+        )
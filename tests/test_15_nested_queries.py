@@ -0,0 +1,152 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tests.utils import create_comments, create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15NestedQueries:
+
+    def test_01_nested_list_has_no_parent_lookup(self, admin_client, admin,
+                                                 client, user, user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        urls = {
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/': 'reviews_title',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/': 'reviews_review',
+        }
+        for url, parent_table in urls.items():
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response.json()['results']
+            parent_queries = [
+                query['sql'] for query in context.captured_queries
+                if f'FROM "{parent_table}"' in query['sql']
+            ]
+            assert not parent_queries, (
+                f'Проверьте, что GET-запрос к `{url}` не загружает '
+                'родительский объект отдельным запросом, если список не '
+                'пуст.'
+            )
+
+    def test_02_missing_parent_is_not_found(self, admin_client, admin,
+                                            client, user, user_client):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        other_title = titles[1]['id']
+        urls = (
+            '/api/v1/titles/9999/reviews/',
+            f'/api/v1/titles/{other_title}/reviews/'
+            f'{reviews[0]["id"]}/comments/',
+        )
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что GET-запрос к `{url}` с несуществующим '
+                'родительским объектом возвращает ответ со статусом 404.'
+            )
+            response = user_client.post(url, data={'text': 'тест', 'score': 5})
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что POST-запрос к `{url}` с несуществующим '
+                'родительским объектом возвращает ответ со статусом 404.'
+            )
+
+    def test_03_parent_exists_with_empty_list(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` для произведения без '
+            'отзывов возвращает ответ со статусом 200.'
+        )
+        assert response.json()['results'] == []
+
+    def user_queries(self, context):
+        return [
+            query['sql'] for query in context.captured_queries
+            if 'FROM "reviews_user"' in query['sql']
+        ]
+
+    def test_04_authors_are_loaded_with_page(self, admin_client, admin,
+                                             client, user, user_client,
+                                             moderator, moderator_client):
+        comments, reviews, titles = create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        })
+        review_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        urls = (
+            review_url,
+            f'{review_url}{reviews[0]["id"]}/',
+            f'{review_url}{reviews[0]["id"]}/comments/',
+            f'{review_url}{reviews[0]["id"]}/comments/{comments[0]["id"]}/',
+        )
+        for url in urls:
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert not self.user_queries(context), (
+                f'Проверьте, что GET-запрос к `{url}` загружает авторов '
+                'тем же запросом, что и сами объекты.'
+            )
+
+    def test_05_author_checks_do_not_load_users(self, admin_client, admin,
+                                                user, user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        from api.v1.authentication import ClaimsAccessToken
+
+        # Токен с утверждениями, как из TokenView: пользователь не
+        # загружается и при аутентификации.
+        user_client = APIClient()
+        user_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {ClaimsAccessToken.for_user(user)}'
+        )
+        review_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        requests = (
+            ('patch', f'{review_url}{reviews[1]["id"]}/', {'text': 'новый'}),
+            (
+                'post',
+                f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+                {'text': 'отзыв', 'score': 7},
+            ),
+            (
+                'patch',
+                f'{review_url}{reviews[0]["id"]}/comments/'
+                f'{comments[1]["id"]}/',
+                {'text': 'новый'},
+            ),
+            (
+                'post',
+                f'{review_url}{reviews[0]["id"]}/comments/',
+                {'text': 'комментарий'},
+            ),
+        )
+        for method, url, data in requests:
+            with CaptureQueriesContext(connection) as context:
+                response = getattr(user_client, method)(url, data=data)
+            assert response.status_code in (
+                HTTPStatus.OK, HTTPStatus.CREATED
+            ), response.json()
+            assert response.json()['author'] == user.username
+            assert not self.user_queries(context), (
+                f'Проверьте, что {method.upper()}-запрос к `{url}` '
+                'проверяет авторство и выводит автора без запроса к '
+                'таблице пользователей.'
+            )
+        response = user_client.patch(
+            f'{review_url}{reviews[0]["id"]}/', data={'text': 'чужой'}
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что пользователь не может изменить чужой отзыв.'
+        )
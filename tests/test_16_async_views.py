@@ -0,0 +1,113 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.asgi import get_asgi_application
+from django.test import RequestFactory
+
+from tests.utils import create_comments
+
+
+def asgi_get(path, token):
+    """GET-запрос через ASGI-приложение Django; возвращает статус и тело
+    ответа."""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [
+            (b'host', b'testserver'),
+            (b'authorization', f'Bearer {token}'.encode()),
+        ],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    async_to_sync(get_asgi_application())(scope, receive, send)
+    body = b''.join(
+        message.get('body', b'') for message in messages
+        if message['type'] == 'http.response.body'
+    )
+    return messages[0]['status'], body
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16AsyncViews:
+
+    def call(self, view, url, **kwargs):
+        request = RequestFactory().get(url)
+        return async_to_sync(view)(request, **kwargs)
+
+    def test_01_async_lists_match_sync(self, admin_client, admin, client,
+                                       user, user_client):
+        from api.v1 import async_views
+
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        cases = (
+            ('/api/v1/titles/', async_views.titles, {}),
+            (
+                f'/api/v1/titles/{title_id}/reviews/',
+                async_views.reviews,
+                {'title_id': title_id},
+            ),
+            (
+                f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+                async_views.comments,
+                {'title_id': title_id, 'review_id': review_id},
+            ),
+        )
+        for url, view, kwargs in cases:
+            expected = client.get(url).json()
+            response = self.call(view, url, **kwargs)
+            assert response.status_code == HTTPStatus.OK
+            assert json.loads(response.content) == expected, (
+                f'Проверьте, что асинхронное представление `{url}` '
+                'возвращает те же данные, что и синхронное.'
+            )
+
+    def test_02_async_list_missing_parent(self, admin_client):
+        from api.v1 import async_views
+
+        url = '/api/v1/titles/9999/reviews/'
+        response = self.call(async_views.reviews, url, title_id=9999)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что асинхронное представление `{url}` возвращает '
+            'ответ со статусом 404 для несуществующего произведения.'
+        )
+
+    def test_03_export_under_asgi(self, admin_client, admin, user,
+                                  user_client, token_admin):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        for url, expected in (
+            ('/api/v1/reviews/export/', reviews),
+            (f'/api/v1/titles/{titles[0]["id"]}/reviews/export/', reviews),
+            ('/api/v1/comments/export/', comments),
+        ):
+            status, body = asgi_get(url, token_admin['access'])
+            assert status == HTTPStatus.OK
+            lines = [json.loads(line) for line in body.decode().splitlines()]
+            assert [line['id'] for line in lines] == [
+                item['id'] for item in expected
+            ], (
+                f'Проверьте, что выгрузка `{url}` под ASGI отдаёт все '
+                'строки, а не обрывается после заголовков.'
+            )
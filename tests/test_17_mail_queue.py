@@ -0,0 +1,149 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError('почтовый сервер недоступен')
+
+
+class UnreachableBackend(BaseEmailBackend):
+    def open(self):
+        raise ConnectionRefusedError('соединение не установлено')
+
+    def send_messages(self, email_messages):
+        raise AssertionError('соединение не открыто')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17MailQueue:
+    url = '/api/v1/auth/signup/'
+    data = {'email': 'queued@yamdb.fake', 'username': 'queued'}
+
+    def test_01_signup_enqueues_code(self, client, settings):
+        from reviews.models import OutgoingEmail
+
+        settings.MAIL_QUEUE_EAGER = False
+        response = client.post(self.url, data=self.data)
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == 0, (
+            f'Проверьте, что POST-запрос к `{self.url}` не отправляет '
+            'письмо сам, а ставит его в очередь.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipients == [self.data['email']]
+
+        call_command('send_queued_mail', '--once')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что команда `send_queued_mail` отправляет письма '
+            'из очереди.'
+        )
+        assert mail.outbox[0].to == [self.data['email']]
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.SENT
+
+        call_command('send_queued_mail', '--once')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отправленное письмо не отправляется повторно.'
+        )
+
+    def test_02_failed_delivery_is_retried(self, client, settings):
+        from django.utils import timezone
+        from reviews.models import OutgoingEmail
+
+        settings.MAIL_QUEUE_EAGER = False
+        settings.MAIL_QUEUE_MAX_ATTEMPTS = 2
+        settings.EMAIL_BACKEND = 'tests.test_17_mail_queue.FailingBackend'
+        client.post(self.url, data=self.data)
+
+        call_command('send_queued_mail', '--once')
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.PENDING, (
+            'Проверьте, что письмо, которое не удалось отправить, остаётся '
+            'в очереди для повторной попытки.'
+        )
+        assert email.attempts == 1 and 'ConnectionError' in email.last_error
+        assert email.send_after > timezone.now(), (
+            'Проверьте, что повторная отправка откладывается.'
+        )
+
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        call_command('send_queued_mail', '--once')
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.FAILED, (
+            'Проверьте, что после MAIL_QUEUE_MAX_ATTEMPTS попыток письмо '
+            'помечается как неотправленное.'
+        )
+
+    def test_03_retry_succeeds(self, client, settings):
+        from django.utils import timezone
+        from reviews.models import OutgoingEmail
+
+        settings.MAIL_QUEUE_EAGER = False
+        settings.EMAIL_BACKEND = 'tests.test_17_mail_queue.FailingBackend'
+        client.post(self.url, data=self.data)
+        call_command('send_queued_mail', '--once')
+
+        settings.EMAIL_BACKEND = (
+            'django.core.mail.backends.locmem.EmailBackend'
+        )
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        call_command('send_queued_mail', '--once')
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.SENT and len(mail.outbox) == 1, (
+            'Проверьте, что письмо отправляется при повторной попытке.'
+        )
+
+    def test_04_connection_failure_is_retried(self, client, settings):
+        from django.utils import timezone
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_BACKEND = 'tests.test_17_mail_queue.UnreachableBackend'
+        response = client.post(self.url, data=self.data)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что регистрация не падает, если почтовый сервер '
+            'недоступен.'
+        )
+        settings.MAIL_QUEUE_EAGER = False
+        client.post(
+            self.url,
+            data={'email': 'second@yamdb.fake', 'username': 'second'},
+        )
+        call_command('send_queued_mail', '--once')
+        for email in OutgoingEmail.objects.all():
+            assert email.status == OutgoingEmail.PENDING, (
+                'Проверьте, что при ошибке соединения письма остаются в '
+                'очереди.'
+            )
+            assert email.attempts == 1, (
+                'Проверьте, что ошибка соединения считается неудачной '
+                'попыткой для каждого письма пачки.'
+            )
+            assert 'ConnectionRefusedError' in email.last_error
+            assert email.send_after > timezone.now()
+
+    def test_05_emails_are_claimed_once(self, client, settings):
+        from django.utils import timezone
+        from reviews import mail as mail_queue
+        from reviews.models import OutgoingEmail
+
+        settings.MAIL_QUEUE_EAGER = False
+        client.post(self.url, data=self.data)
+        first = mail_queue.claim_pending(10)
+        assert len(first) == 1
+        assert mail_queue.claim_pending(10) == [], (
+            'Проверьте, что письмо, выбранное одним отправителем, не '
+            'выбирает другой.'
+        )
+        call_command('send_queued_mail', '--once')
+        assert len(mail.outbox) == 0
+
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        assert len(mail_queue.claim_pending(10)) == 1, (
+            'Проверьте, что письмо снова попадает в очередь, когда срок '
+            'захвата истёк.'
+        )
@@ -0,0 +1,76 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ConfirmationCode:
+    url_signup = '/api/v1/auth/signup/'
+    url_token = '/api/v1/auth/token/'
+    data = {'email': 'code@yamdb.fake', 'username': 'code_user'}
+
+    @pytest.fixture(autouse=True)
+    def clear_used_codes(self):
+        cache.clear()
+
+    def signup(self, client):
+        response = client.post(self.url_signup, data=self.data)
+        assert response.status_code == HTTPStatus.OK
+        return mail.outbox[-1].body
+
+    def get_token(self, client, code):
+        data = {'username': self.data['username'], 'confirmation_code': code}
+        return client.post(self.url_token, data=data)
+
+    def test_01_code_is_single_use(self, client):
+        code = self.signup(client)
+        response = self.get_token(client, code)
+        assert response.status_code == HTTPStatus.OK and 'token' in (
+            response.json()
+        ), (
+            f'Проверьте, что POST-запрос к `{self.url_token}` с кодом из '
+            'письма возвращает токен.'
+        )
+        response = self.get_token(client, code)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения нельзя использовать повторно.'
+        )
+
+    def test_02_code_expires(self, client, settings):
+        code = self.signup(client)
+        settings.CONFIRMATION_CODE_TIMEOUT = -1
+        response = self.get_token(client, code)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что просроченный код подтверждения не принимается.'
+        )
+
+    def test_03_code_is_bound_to_user(self, client):
+        code = self.signup(client)
+        other = {'email': 'other@yamdb.fake', 'username': 'other_user'}
+        client.post(self.url_signup, data=other)
+        response = client.post(
+            self.url_token,
+            data={'username': other['username'], 'confirmation_code': code},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения одного пользователя не '
+            'подходит другому.'
+        )
+
+    def test_04_signup_writes_user_once(self, client):
+        with CaptureQueriesContext(connection) as context:
+            self.signup(client)
+        user_writes = [
+            query['sql'] for query in context.captured_queries
+            if '"reviews_user"' in query['sql']
+            and not query['sql'].startswith('SELECT')
+        ]
+        assert len(user_writes) == 1, (
+            f'Проверьте, что POST-запрос к `{self.url_signup}` записывает '
+            'пользователя в базу один раз и не сохраняет код '
+            f'подтверждения. Запросы: {user_writes}'
+        )
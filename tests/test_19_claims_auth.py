@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ClaimsAuth:
+    url = '/api/v1/categories/'
+
+    @pytest.fixture(autouse=True)
+    def clear_revocations(self):
+        cache.clear()
+
+    def get_client(self, user):
+        from api.v1 import confirmation
+
+        response = APIClient().post(
+            '/api/v1/auth/token/',
+            data={
+                'username': user.username,
+                'confirmation_code': confirmation.make_code(user),
+            },
+        )
+        assert response.status_code == HTTPStatus.OK
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}'
+        )
+        return client
+
+    def post_category(self, client, slug):
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                self.url, data={'name': slug, 'slug': slug}
+            )
+        user_queries = [
+            query['sql'] for query in context.captured_queries
+            if 'FROM "reviews_user"' in query['sql']
+        ]
+        return response, user_queries
+
+    def test_01_token_claims_skip_user_query(self, admin):
+        client = self.get_client(admin)
+        response, user_queries = self.post_category(client, 'films')
+        assert response.status_code == HTTPStatus.CREATED
+        assert not user_queries, (
+            'Проверьте, что запрос с токеном из `/api/v1/auth/token/` не '
+            'загружает пользователя из базы данных.'
+        )
+
+    def test_02_role_change_applies_to_issued_tokens(self, admin):
+        client = self.get_client(admin)
+        admin.bio = 'новая биография'
+        admin.save()
+        response, user_queries = self.post_category(client, 'films')
+        assert response.status_code == HTTPStatus.CREATED and not (
+            user_queries
+        ), (
+            'Проверьте, что изменение профиля без смены роли не заставляет '
+            'проверять токен по базе данных.'
+        )
+
+        admin.role = 'user'
+        admin.save()
+        response, _ = self.post_category(client, 'music')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что после понижения роли ранее выданный токен '
+            'больше не даёт прав администратора.'
+        )
+
+    def test_03_inactive_user_is_rejected(self, user):
+        client = self.get_client(user)
+        user.is_active = False
+        user.save()
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен деактивированного пользователя не '
+            'принимается.'
+        )
+
+    def test_04_me_uses_profile_from_db(self, user):
+        client = self.get_client(user)
+        response = client.patch('/api/v1/users/me/', data={'bio': 'новая'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['email'] == user.email
+        assert response.json()['bio'] == 'новая'
@@ -0,0 +1,125 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+def set_rates(settings, **rates):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': rates,
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Throttling:
+
+    def test_01_signup_is_throttled_by_ip(self, client, settings):
+        set_rates(settings, **{'signup.write': '2/hour'})
+        url = '/api/v1/auth/signup/'
+        for idx in range(2):
+            response = client.post(url, data={
+                'email': f'user{idx}@yamdb.fake', 'username': f'user{idx}'
+            })
+            assert response.status_code == HTTPStatus.OK
+        response = client.post(url, data={
+            'email': 'user2@yamdb.fake', 'username': 'user2'
+        })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что POST-запросы к `{url}` сверх лимита получают '
+            'ответ со статусом 429.'
+        )
+        retry_after = int(response['Retry-After'])
+        assert 0 < retry_after <= 60 * 30, (
+            'Проверьте, что ответ со статусом 429 содержит заголовок '
+            '`Retry-After` со временем до появления свободного запроса.'
+        )
+
+    def test_02_buckets_are_per_user(self, admin_client, user_client,
+                                     settings):
+        titles, _, _ = create_titles(admin_client)
+        set_rates(settings, **{'reviews.write': '1/min'})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = {'text': 'отзыв', 'score': 5}
+        assert user_client.post(url, data=data).status_code == (
+            HTTPStatus.CREATED
+        )
+        response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что POST-запросы к `{url}` сверх лимита '
+            'пользователя получают ответ со статусом 429.'
+        )
+        assert admin_client.post(url, data=data).status_code == (
+            HTTPStatus.CREATED
+        ), 'Проверьте, что лимит запросов считается для каждого пользователя.'
+        assert user_client.get(url).status_code == HTTPStatus.OK, (
+            'Проверьте, что лимит на запись не ограничивает чтение.'
+        )
+
+
+    def test_03_forwarded_for_does_not_reset_bucket(self, client, settings):
+        set_rates(settings, **{'token.write': '2/hour'})
+        url = '/api/v1/auth/token/'
+        data = {'username': 'nobody', 'confirmation_code': '0'}
+        statuses = [
+            client.post(
+                url, data=data, HTTP_X_FORWARDED_FOR=f'10.0.0.{idx}'
+            ).status_code
+            for idx in range(3)
+        ]
+        assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что подмена `X-Forwarded-For` не сбрасывает лимит '
+            f'запросов к `{url}` с одного адреса.'
+        )
+
+    def test_04_metrics_are_throttled(self, admin_client, settings):
+        set_rates(settings, **{'metrics.read': '1/min'})
+        url = '/api/v1/metrics/'
+        assert admin_client.get(url).status_code == HTTPStatus.OK
+        assert admin_client.get(url).status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        ), f'Проверьте, что запросы к `{url}` ограничены по частоте.'
+
+
+class Test20BucketStores:
+
+    def test_01_lru_store_refills_and_evicts(self, monkeypatch):
+        from api.v1 import throttling
+
+        now = [1000.0]
+        monkeypatch.setattr(throttling.time, 'monotonic', lambda: now[0])
+        store = throttling.LRUBucketStore(max_entries=2)
+        assert store.consume('a', 2, 60) == 0
+        assert store.consume('a', 2, 60) == 0
+        assert store.consume('a', 2, 60) == pytest.approx(30)
+        now[0] += 30
+        assert store.consume('a', 2, 60) == 0
+        store.consume('b', 2, 60)
+        store.consume('c', 2, 60)
+        assert len(store.buckets) == 2 and 'a' not in store.buckets
+
+    def test_02_shared_store(self, settings):
+        from api.v1.throttling import SharedBucketStore
+
+        settings.CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+            }
+        }
+        from django.core.cache import cache
+
+        store = SharedBucketStore()
+        store.clear()
+        assert store.consume('a', 1, 60) == 0
+        assert store.consume('a', 1, 60) > 0
+        assert store.consume('b', 1, 60) == 0
+
+        cache.set('other', 'value')
+        store.clear()
+        assert store.consume('a', 1, 60) == 0, (
+            'Проверьте, что clear() сбрасывает вёдра общего хранилища.'
+        )
+        assert cache.get('other') == 'value', (
+            'Проверьте, что clear() не удаляет из общего кэша чужие ключи.'
+        )
@@ -0,0 +1,62 @@
+import re
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Metrics:
+    url = '/api/v1/metrics/'
+
+    def get_value(self, text, name, route, method='GET'):
+        match = re.search(
+            rf'^{name}{{route="{route}",method="{method}"}} (\S+)$',
+            text,
+            re.MULTILINE,
+        )
+        assert match, (
+            f'Проверьте, что `{self.url}` содержит метрику `{name}` для '
+            f'маршрута `{route}`.'
+        )
+        return float(match.group(1))
+
+    def test_01_metrics_are_admin_only(self, client, user_client):
+        assert client.get(self.url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(self.url).status_code == HTTPStatus.FORBIDDEN
+
+    def test_02_request_metrics(self, admin_client, client):
+        from api import metrics
+
+        metrics.clear()
+        create_titles(admin_client)
+        client.get('/api/v1/titles/?count=false')
+        response = admin_client.get(self.url)
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+
+        assert self.get_value(
+            text, 'yamdb_request_duration_seconds_count', 'titles-list'
+        ) == 1
+        assert self.get_value(
+            text, 'yamdb_request_db_queries_sum', 'titles-list'
+        ) >= 1, 'Проверьте, что метрики учитывают SQL-запросы.'
+        assert self.get_value(
+            text, 'yamdb_request_serializer_duration_seconds_sum',
+            'titles-list',
+        ) > 0, 'Проверьте, что метрики учитывают время сериализации.'
+        assert self.get_value(
+            text, 'yamdb_response_size_bytes_sum', 'titles-list'
+        ) > 0
+        assert self.get_value(
+            text, 'yamdb_request_duration_seconds_count', 'titles-list',
+            method='POST',
+        ) == 2
+        assert re.search(
+            r'^yamdb_request_duration_seconds_bucket\{route="titles-list",'
+            r'method="GET",le="\+Inf"\} 1$',
+            text,
+            re.MULTILINE,
+        )
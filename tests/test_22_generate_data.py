@@ -0,0 +1,125 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+
+COUNTS = {
+    'users': 40,
+    'categories': 3,
+    'genres': 5,
+    'titles': 30,
+    'reviews': 400,
+    'comments': 300,
+}
+
+
+def generate(**options):
+    call_command('generate_data', stdout=StringIO(), **COUNTS, **options)
+
+
+def read_csv(path, name):
+    with open(path / name, encoding='utf-8', newline='') as csv_file:
+        return list(csv.reader(csv_file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22GenerateData:
+
+    def test_01_row_counts(self):
+        from reviews.models import (
+            Category,
+            Comment,
+            Genre,
+            Review,
+            Title,
+            User,
+        )
+
+        generate()
+        counts = {
+            'users': User.objects.count(),
+            'categories': Category.objects.count(),
+            'genres': Genre.objects.count(),
+            'titles': Title.objects.count(),
+            'reviews': Review.objects.count(),
+            'comments': Comment.objects.count(),
+        }
+        assert counts == COUNTS, (
+            'Проверьте, что команда `generate_data` создаёт ровно заданное '
+            'число строк каждой таблицы.'
+        )
+
+    def test_02_reviews_are_skewed_and_unique(self):
+        from reviews.models import Review
+
+        generate()
+        per_title = list(
+            Review.objects.values('title_id', 'author_id')
+            .annotate(count=Count('id'))
+            .filter(count__gt=1)
+        )
+        assert not per_title, (
+            'Проверьте, что команда `generate_data` не создаёт двух отзывов '
+            'одного автора на одно произведение.'
+        )
+        sizes = sorted(
+            Review.objects.values('title_id')
+            .annotate(count=Count('id'))
+            .values_list('count', flat=True),
+            reverse=True,
+        )
+        assert sizes[0] >= 5 * sizes[len(sizes) // 2], (
+            'Проверьте, что отзывы распределены по произведениям '
+            'неравномерно (по закону Ципфа).'
+        )
+
+    def test_03_ratings_and_search_are_built(self, client):
+        from reviews.models import Review, Title
+
+        generate()
+        review = Review.objects.first()
+        title = Title.objects.get(pk=review.title_id)
+        assert title.rating_count == Review.objects.filter(
+            title_id=title.pk
+        ).count(), (
+            'Проверьте, что после `generate_data` пересчитывается рейтинг '
+            'произведений.'
+        )
+        word = review.text.split()[0]
+        response = client.get(f'/api/v1/search/?q={word}&type=review')
+        assert response.json()['results'], (
+            'Проверьте, что после `generate_data` отзывы доступны в поиске.'
+        )
+
+    def test_04_csv_is_deterministic(self, tmp_path):
+        generate(seed=7, csv=str(tmp_path / 'first'))
+        generate(seed=7, csv=str(tmp_path / 'second'))
+        generate(seed=8, csv=str(tmp_path / 'other'))
+        first = read_csv(tmp_path / 'first', 'review.csv')
+        assert first == read_csv(tmp_path / 'second', 'review.csv'), (
+            'Проверьте, что `generate_data` с одинаковым `--seed` выдаёт '
+            'одинаковые данные.'
+        )
+        assert first != read_csv(tmp_path / 'other', 'review.csv'), (
+            'Проверьте, что `--seed` меняет генерируемые данные.'
+        )
+        assert len(first) == COUNTS['reviews'] + 1
+
+    def test_05_csv_loads_with_add_data(self, tmp_path):
+        from reviews.models import Comment, Review
+
+        generate(csv=str(tmp_path))
+        call_command('add_data', path=str(tmp_path), stdout=StringIO())
+        assert Review.objects.count() == COUNTS['reviews']
+        assert Comment.objects.count() == COUNTS['comments'], (
+            'Проверьте, что csv команды `generate_data` загружаются командой '
+            '`add_data`.'
+        )
+
+    def test_06_refuses_non_empty_database(self, admin_client):
+        from django.core.management.base import CommandError
+
+        with pytest.raises(CommandError):
+            generate()
@@ -0,0 +1,162 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews
+
+
+def get_statistics():
+    from reviews.models import CategoryStatistics, GenreStatistics
+
+    return {
+        model.__name__: sorted(model.objects.values_list(
+            'pk', 'title_count', 'review_count', 'rating_sum', 'rating'
+        ))
+        for model in (GenreStatistics, CategoryStatistics)
+    }
+
+
+def check_matches_rebuild(action):
+    maintained = get_statistics()
+    call_command('rebuild_statistics', stdout=None)
+    assert maintained == get_statistics(), (
+        'Проверьте, что статистика жанров и категорий обновляется, когда '
+        f'{action}: она должна совпадать с пересчитанной с нуля.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Statistics:
+
+    def create_reviews(self, admin_client, admin, user, user_client,
+                       moderator, moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        }
+        return create_reviews(admin_client, author_map)
+
+    def test_01_stats_in_lists(self, admin_client, admin, user, user_client,
+                               moderator, moderator_client, client):
+        self.create_reviews(
+            admin_client, admin, user, user_client, moderator,
+            moderator_client,
+        )
+        response = client.get('/api/v1/genres/')
+        assert 'stats' not in response.json()['results'][0], (
+            'Проверьте, что статистика жанров выводится только по '
+            'параметру `stats`.'
+        )
+        response = client.get('/api/v1/genres/?stats=true')
+        assert response.status_code == HTTPStatus.OK
+        stats = {
+            genre['slug']: genre['stats']
+            for genre in response.json()['results']
+        }
+        assert stats['horror'] == {
+            'title_count': 1, 'review_count': 3, 'rating': 5.0
+        }, (
+            'Проверьте, что `/api/v1/genres/?stats=true` возвращает число '
+            'произведений, отзывов и среднюю оценку жанра.'
+        )
+        assert stats['drama'] == {
+            'title_count': 1, 'review_count': 0, 'rating': None
+        }
+        response = client.get('/api/v1/categories/?stats=true')
+        stats = {
+            category['slug']: category['stats']
+            for category in response.json()['results']
+        }
+        assert stats['films'] == {
+            'title_count': 1, 'review_count': 3, 'rating': 5.0
+        }, (
+            'Проверьте, что `/api/v1/categories/?stats=true` возвращает '
+            'статистику категории.'
+        )
+
+    def test_02_stats_follow_changes(self, admin_client, admin, user,
+                                     user_client, moderator,
+                                     moderator_client):
+        reviews, titles = self.create_reviews(
+            admin_client, admin, user, user_client, moderator,
+            moderator_client,
+        )
+        check_matches_rebuild('создаются отзывы')
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+
+        user_client.patch(f'{url}{reviews[1]["id"]}/', data={'score': 9})
+        check_matches_rebuild('меняется оценка отзыва')
+
+        admin_client.delete(f'{url}{reviews[2]["id"]}/')
+        check_matches_rebuild('удаляется отзыв')
+
+        response = admin_client.patch(
+            f'/api/v1/titles/{title_id}/',
+            data={'genre': ['drama', 'comedy'], 'category': 'books'},
+        )
+        assert response.status_code == HTTPStatus.OK
+        check_matches_rebuild('меняются жанры и категория произведения')
+
+        response = admin_client.post(
+            '/api/v1/titles/bulk/',
+            data=[{
+                'name': 'Чужой',
+                'year': 1979,
+                'genre': ['horror'],
+                'category': 'films',
+            }],
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        check_matches_rebuild('произведения создаются пачкой')
+
+        admin_client.delete(f'/api/v1/titles/{title_id}/')
+        check_matches_rebuild('удаляется произведение с отзывами')
+
+        admin_client.delete('/api/v1/genres/horror/')
+        admin_client.delete('/api/v1/categories/books/')
+        check_matches_rebuild('удаляются жанр и категория')
+
+    def test_03_stats_list_query_count_is_fixed(self, admin_client, client):
+        def count_queries():
+            with CaptureQueriesContext(connection) as context:
+                response = client.get('/api/v1/genres/?stats=true')
+            assert response.status_code == HTTPStatus.OK
+            return len(context.captured_queries)
+
+        admin_client.post('/api/v1/genres/', data={'name': 'А', 'slug': 'a'})
+        before = count_queries()
+        for idx in range(5):
+            admin_client.post(
+                '/api/v1/genres/', data={'name': f'Ж{idx}', 'slug': f'g{idx}'}
+            )
+        assert count_queries() == before, (
+            'Проверьте, что статистика жанров загружается вместе со '
+            'списком, без отдельного запроса для каждого жанра.'
+        )
+
+    def test_04_cached_stats_are_invalidated(self, admin_client, admin,
+                                             user, user_client, moderator,
+                                             moderator_client, client):
+        reviews, titles = self.create_reviews(
+            admin_client, admin, user, user_client, moderator,
+            moderator_client,
+        )
+        url = '/api/v1/categories/?stats=true'
+        client.get(url)
+        admin_client.delete(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        )
+        stats = {
+            category['slug']: category['stats']
+            for category in client.get(url).json()['results']
+        }
+        assert stats['films']['review_count'] == 2, (
+            'Проверьте, что кэш списка со статистикой сбрасывается при '
+            'изменении отзывов.'
+        )
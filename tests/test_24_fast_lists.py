@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24FastLists:
+
+    def get_content(self, client, url, fast, settings):
+        from api.v1.cache import get_response_cache
+
+        settings.FAST_LIST_SERIALIZERS = fast
+        get_response_cache().clear()
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        return response.content
+
+    def test_01_plans_are_built(self):
+        from api.plans import get_plan
+        from api.v1.serializers import (
+            CommentSerializer,
+            ReviewSerializer,
+            TitleSerializer,
+        )
+
+        for serializer_class in (
+            TitleSerializer, ReviewSerializer, CommentSerializer
+        ):
+            assert get_plan(serializer_class) is not None, (
+                'Проверьте, что для сериализатора '
+                f'{serializer_class.__name__} строится план чтения.'
+            )
+
+    def test_02_unsupported_serializer_has_no_plan(self):
+        from rest_framework import serializers
+
+        from api.plans import get_plan
+        from reviews.models import Title
+
+        class MethodSerializer(serializers.ModelSerializer):
+            upper = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Title
+                fields = ('id', 'upper')
+
+            def get_upper(self, title):
+                return title.name.upper()
+
+        assert get_plan(MethodSerializer) is None, (
+            'Проверьте, что для сериализатора с неподдерживаемыми полями '
+            'план не строится.'
+        )
+
+    def test_03_fast_lists_match_serializers(self, admin_client, admin,
+                                             user, user_client, client,
+                                             settings):
+        from reviews.models import Title
+
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        user_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/',
+            data={'score': 8},
+        )
+        Title.objects.filter(pk=titles[1]['id']).update(category=None)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}'
+        urls = (
+            '/api/v1/titles/',
+            '/api/v1/titles/?ordering=-rating',
+            '/api/v1/titles/?genre=comedy&count=false',
+            '/api/v1/titles/?pagination=cursor',
+            '/api/v1/titles/?name=missing',
+            f'{title_url}/reviews/',
+            f'{title_url}/reviews/?pagination=cursor',
+            f'{title_url}/reviews/{reviews[0]["id"]}/comments/',
+            f'{title_url}/reviews/{reviews[0]["id"]}/comments/?count=false',
+        )
+        for url in urls:
+            fast = self.get_content(client, url, True, settings)
+            slow = self.get_content(client, url, False, settings)
+            assert fast == slow, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает тот же '
+                'JSON, что и сериализатор DRF.'
+            )
@@ -0,0 +1,141 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_reviews
+
+
+def get_with_queries(client, url):
+    from api.v1.cache import get_response_cache
+
+    get_response_cache().clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает статус 200.'
+    )
+    return response.json(), ' '.join(
+        query['sql'] for query in context.captured_queries
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25SparseFields:
+
+    def create_reviews(self, admin_client, admin, user, user_client):
+        return create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+
+    @pytest.mark.parametrize('fast', (True, False))
+    def test_01_titles_fields(self, admin_client, admin, user, user_client,
+                              client, settings, fast):
+        settings.FAST_LIST_SERIALIZERS = fast
+        self.create_reviews(admin_client, admin, user, user_client)
+        data, sql = get_with_queries(
+            client, '/api/v1/titles/?fields=id,name,rating'
+        )
+        for title in data['results']:
+            assert list(title) == ['id', 'name', 'rating'], (
+                'Проверьте, что `/api/v1/titles/?fields=id,name,rating` '
+                'возвращает только перечисленные поля.'
+            )
+        assert data['results'][0]['rating'] is not None
+        assert 'description' not in sql and 'reviews_category' not in sql, (
+            'Проверьте, что для `?fields=` из базы читаются только колонки '
+            'выбранных полей, а связи невыбранных полей не присоединяются.'
+        )
+        assert 'reviews_genre' not in sql, (
+            'Проверьте, что жанры не загружаются, если поле `genre` не '
+            'запрошено.'
+        )
+
+    @pytest.mark.parametrize('fast', (True, False))
+    def test_02_reviews_omit_and_cursor(self, admin_client, admin, user,
+                                        user_client, client, settings,
+                                        monkeypatch, fast):
+        from api.v1.pagination import KeysetPagination
+
+        settings.FAST_LIST_SERIALIZERS = fast
+        monkeypatch.setattr(KeysetPagination, 'page_size', 1)
+        reviews, titles = self.create_reviews(
+            admin_client, admin, user, user_client
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            '?omit=text,author&pagination=cursor'
+        )
+        data, sql = get_with_queries(client, url)
+        assert list(data['results'][0]) == ['id', 'score', 'pub_date'], (
+            'Проверьте, что `?omit=` убирает перечисленные поля из ответа.'
+        )
+        assert '"text"' not in sql and 'reviews_user' not in sql, (
+            'Проверьте, что для `?omit=` невыбранные колонки и связи не '
+            'загружаются из базы.'
+        )
+        next_page, _ = get_with_queries(client, data['next'])
+        assert next_page['results'][0]['id'] == reviews[1]['id'], (
+            'Проверьте, что пагинация по ключу работает вместе с '
+            '`?omit=`.'
+        )
+
+    def test_03_fast_and_slow_paths_match(self, admin_client, admin, user,
+                                          user_client, client, settings):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}'
+        urls = (
+            '/api/v1/titles/?fields=genre,category',
+            '/api/v1/titles/?omit=genre&ordering=-rating',
+            f'{title_url}/reviews/?fields=author',
+            f'{title_url}/reviews/{reviews[0]["id"]}/comments/?fields=text',
+        )
+        for url in urls:
+            settings.FAST_LIST_SERIALIZERS = True
+            fast, _ = get_with_queries(client, url)
+            settings.FAST_LIST_SERIALIZERS = False
+            slow, _ = get_with_queries(client, url)
+            assert fast == slow, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает одинаковый '
+                'ответ с планом и без него.'
+            )
+
+    def test_04_detail_and_other_viewsets(self, admin_client, admin, user,
+                                          user_client, client):
+        reviews, titles = self.create_reviews(
+            admin_client, admin, user, user_client
+        )
+        data, sql = get_with_queries(
+            client, f'/api/v1/titles/{titles[0]["id"]}/?fields=name'
+        )
+        assert data == {'name': titles[0]['name']}, (
+            'Проверьте, что `?fields=` работает и для отдельного объекта.'
+        )
+        assert 'reviews_genre' not in sql
+        data, sql = get_with_queries(
+            client, '/api/v1/genres/?stats=true&fields=slug'
+        )
+        assert list(data['results'][0]) == ['slug'], (
+            'Проверьте, что `?fields=` работает для списка жанров.'
+        )
+        assert 'reviews_genrestatistics' not in sql, (
+            'Проверьте, что статистика не присоединяется, если поле '
+            '`stats` не запрошено.'
+        )
+        data, _ = get_with_queries(
+            admin_client, '/api/v1/users/?omit=bio,first_name,last_name'
+        )
+        assert list(data['results'][0]) == ['username', 'email', 'role']
+
+    def test_05_unknown_fields(self, client):
+        response = client.get('/api/v1/titles/?fields=id,secret')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что для неизвестного поля в `?fields=` '
+            'возвращается ошибка 400.'
+        )
+        assert 'fields' in response.json()
+        response = client.get('/api/v1/categories/?omit=secret')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,124 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+def read_lines(response):
+    assert response.status_code == HTTPStatus.OK
+    assert response.streaming, (
+        'Проверьте, что выгрузка отдаётся потоковым ответом.'
+    )
+    assert response['Content-Type'] == 'application/x-ndjson'
+    content = b''.join(response.streaming_content).decode()
+    return [json.loads(line) for line in content.splitlines()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26Export:
+
+    def create_comments(self, admin_client, admin, user, user_client,
+                        moderator, moderator_client):
+        return create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        })
+
+    def test_01_title_reviews_export(self, admin_client, admin, user,
+                                     user_client, moderator,
+                                     moderator_client, client):
+        from api.plans import get_plan
+        from api.v1.serializers import (
+            CommentExportSerializer,
+            ReviewExportSerializer,
+        )
+        from reviews.models import Review
+
+        for serializer_class in (
+            ReviewExportSerializer, CommentExportSerializer
+        ):
+            assert get_plan(serializer_class) is not None, (
+                'Проверьте, что выгрузка сериализуется по плану чтения.'
+            )
+        comments, reviews, titles = self.create_comments(
+            admin_client, admin, user, user_client, moderator,
+            moderator_client,
+        )
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/export/'
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{url}` доступен только администратору.'
+        )
+        lines = read_lines(admin_client.get(url))
+        expected = json.loads(json.dumps(ReviewExportSerializer(
+            Review.objects.filter(title_id=title_id).order_by('id'),
+            many=True,
+        ).data))
+        assert lines == expected, (
+            f'Проверьте, что `{url}` выгружает все отзывы произведения по '
+            'одному объекту JSON на строку в порядке id.'
+        )
+        assert admin_client.get(
+            '/api/v1/titles/999/reviews/export/'
+        ).status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_chunks_and_resume(self, admin_client, admin, user,
+                                  user_client, moderator, moderator_client,
+                                  settings):
+        from reviews.models import Comment
+
+        self.create_comments(
+            admin_client, admin, user, user_client, moderator,
+            moderator_client,
+        )
+        settings.EXPORT_CHUNK_SIZE = 2
+        url = '/api/v1/comments/export/'
+        ids = list(Comment.objects.order_by('id').values_list('id', flat=True))
+        response = admin_client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            lines = read_lines(response)
+        assert [line['id'] for line in lines] == ids, (
+            f'Проверьте, что `{url}` выгружает все комментарии.'
+        )
+        assert len(context.captured_queries) == 2, (
+            'Проверьте, что выгрузка читает базу пачками по '
+            '`EXPORT_CHUNK_SIZE`.'
+        )
+        assert {'review', 'author', 'text'} <= set(lines[0])
+        lines = read_lines(admin_client.get(f'{url}?after={ids[1]}'))
+        assert [line['id'] for line in lines] == ids[2:], (
+            'Проверьте, что `?after=` продолжает выгрузку после указанного '
+            'id.'
+        )
+        response = admin_client.get(f'{url}?after=abc')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_review_comments_and_all_reviews(self, admin_client, admin,
+                                                user, user_client, moderator,
+                                                moderator_client):
+        comments, reviews, titles = self.create_comments(
+            admin_client, admin, user, user_client, moderator,
+            moderator_client,
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/export/'
+        )
+        lines = read_lines(admin_client.get(url))
+        assert {line['review'] for line in lines} == {reviews[0]['id']}, (
+            f'Проверьте, что `{url}` выгружает комментарии только этого '
+            'отзыва.'
+        )
+        lines = read_lines(admin_client.get('/api/v1/reviews/export/'))
+        assert [(line['id'], line['title']) for line in lines] == [
+            (review['id'], titles[0]['id']) for review in reviews
+        ], (
+            'Проверьте, что `/api/v1/reviews/export/` выгружает все отзывы с '
+            'id произведения.'
+        )
@@ -0,0 +1,87 @@
+import csv
+import gzip
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+COUNTS = {
+    'users': 20,
+    'categories': 3,
+    'genres': 4,
+    'titles': 15,
+    'reviews': 120,
+    'comments': 60,
+}
+
+
+def dump(path, **options):
+    call_command(
+        'dump_data', path=str(path), stdout=StringIO(), **options
+    )
+
+
+def read_dump(path):
+    from reviews.management.commands.add_data import FILE_MODEL_MAPPING
+
+    result = {}
+    for file in FILE_MODEL_MAPPING:
+        if (path / file).exists():
+            csv_file = open(path / file, encoding='utf-8', newline='')
+        else:
+            csv_file = gzip.open(
+                path / f'{file}.gz', 'rt', encoding='utf-8', newline=''
+            )
+        with csv_file:
+            result[file] = list(csv.reader(csv_file))
+    return result
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27DumpData:
+
+    def test_01_dump_matches_add_data_format(self, tmp_path):
+        from reviews.management.commands.add_data import FILE_COLUMNS
+        from reviews.models import Review
+
+        call_command('generate_data', stdout=StringIO(), **COUNTS)
+        dump(tmp_path, chunk_size=7)
+        files = read_dump(tmp_path)
+        for file, rows in files.items():
+            header = rows[0]
+            assert header[:len(FILE_COLUMNS[file])] == list(
+                FILE_COLUMNS[file]
+            ), (
+                'Проверьте, что `dump_data` пишет колонки в том же порядке, '
+                f'что и `{file}` в static/data.'
+            )
+        reviews = files['review.csv'][1:]
+        assert len(reviews) == COUNTS['reviews'], (
+            'Проверьте, что `dump_data` выгружает все строки таблицы, '
+            'сколько бы пачек ни понадобилось.'
+        )
+        ids = [int(row[0]) for row in reviews]
+        assert ids == list(
+            Review.objects.order_by('id').values_list('id', flat=True)
+        )
+
+    def test_02_gzip_round_trip(self, tmp_path):
+        from reviews.management.commands.add_data import FILE_MODEL_MAPPING
+
+        call_command('generate_data', stdout=StringIO(), **COUNTS)
+        dump(tmp_path / 'before', gzip=True, workers=3)
+        assert (tmp_path / 'before' / 'review.csv.gz').exists(), (
+            'Проверьте, что с `--gzip` файлы сжимаются в `.csv.gz`.'
+        )
+        for model in reversed(list(FILE_MODEL_MAPPING.values())):
+            model.objects.all().delete()
+        call_command(
+            'add_data', path=str(tmp_path / 'before'), stdout=StringIO()
+        )
+        dump(tmp_path / 'after')
+        assert read_dump(tmp_path / 'before') == read_dump(
+            tmp_path / 'after'
+        ), (
+            'Проверьте, что файлы `dump_data --gzip` загружаются командой '
+            '`add_data` без потерь.'
+        )
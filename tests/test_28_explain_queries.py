@@ -0,0 +1,67 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments
+
+
+def explain(**options):
+    """Вывод explain_queries по разделам: {заголовок: строки раздела}."""
+    out = StringIO()
+    call_command('explain_queries', stdout=out, no_color=True, **options)
+    sections = {}
+    lines = None
+    for line in out.getvalue().splitlines():
+        if line.startswith('  '):
+            lines.append(line.strip())
+        else:
+            lines = sections[line] = []
+    return sections
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28ExplainQueries:
+
+    def test_01_plan_for_each_list_endpoint(self, admin_client, admin,
+                                            user, user_client):
+        from api.v1.urls import router
+
+        create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        sections = explain()
+        for prefix, _, _ in router.registry:
+            heading = f'/{prefix}/'
+            assert heading in sections, (
+                'Проверьте, что `explain_queries` выводит раздел для '
+                f'списка `{heading}`.'
+            )
+            lines = sections[heading]
+            assert lines and lines[0].startswith('SELECT'), (
+                f'Проверьте, что `explain_queries` печатает SQL списка '
+                f'`{heading}`.'
+            )
+            assert any(
+                'SCAN' in line or 'SEARCH' in line for line in lines[1:]
+            ), (
+                f'Проверьте, что `explain_queries` печатает план запроса '
+                f'списка `{heading}`.'
+            )
+
+    def test_02_query_params_and_missing_parents(self):
+        sections = explain(query='year=1984')
+        assert '"reviews_title"."year" = 1984' in sections['/titles/'][0], (
+            'Проверьте, что `explain_queries --query` применяет фильтры '
+            'списка.'
+        )
+        nested = [
+            lines for heading, lines in sections.items()
+            if 'title_id' in heading
+        ]
+        assert nested and all(
+            lines[0].startswith('пропущено') for lines in nested
+        ), (
+            'Проверьте, что без отзывов в базе вложенные списки '
+            'пропускаются.'
+        )